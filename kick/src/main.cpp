@@ -37,6 +37,12 @@ contain incorrect comments.
 #include "hardware/pwm.h"
 #include "samples/samples.h"  // Header file containing sample data arrays
 
+#ifndef SAMPLE_FMT_PCM16
+// Bank generated before per-sample storage formats: everything is 16-bit PCM
+#define SAMPLE_FMT_PCM16 0
+const uint8_t sample_formats[NUM_SAMPLES] = {};
+#endif
+
 #define FRAC_BITS 12
 #define FRAC_MASK ((1UL << FRAC_BITS) - 1)
 
@@ -55,11 +61,181 @@ uint sliceAudio, sliceIRQ;
 volatile bool ledOn = false;
 uint32_t ledOnTime = 0;
 
-inline int16_t readPCM(const volatile uint8_t* base, uint32_t idx) {
+typedef int16_t (*PcmReader)(const volatile uint8_t* base, uint32_t idx);
+
+int16_t readPCM(const volatile uint8_t* base, uint32_t idx) {
   uint32_t byteIndex = idx << 1;
   return int16_t(base[byteIndex] | (base[byteIndex + 1] << 8));
 }
 
+// 16-bit PCM on a halfword boundary: one aligned load from XIP flash
+// instead of two byte loads. int16_t arrays (tools: -f i16), .incbin and
+// deduplicated banks are aligned; uint8_t arrays may start anywhere, and
+// the Cortex-M0+ faults on an unaligned halfword load, see readerFor().
+int16_t readPCMAligned(const volatile uint8_t* base, uint32_t idx) {
+  return ((const volatile int16_t*)base)[idx];
+}
+
+// Packed 10-bit: 4 samples per 5 bytes, little-endian bit stream
+int16_t readPCM10(const volatile uint8_t* base, uint32_t idx) {
+  const volatile uint8_t* p = base + (idx >> 2) * 5 + (idx & 3);
+  uint32_t shift = (idx & 3) << 1;
+  uint16_t v = ((p[0] | (p[1] << 8)) >> shift) & 0x3FF;
+  return int16_t(uint16_t(v << 6));
+}
+
+// 8-bit signed PCM
+int16_t readPCM8(const volatile uint8_t* base, uint32_t idx) {
+  return int16_t(uint16_t(base[idx]) << 8);
+}
+
+// IMA-ADPCM, 4 bits per sample in seekable blocks (see tools/adpcm.py):
+// int16 predictor, uint8 step index, 1 pad byte, then 2 codes per byte,
+// low nibble first.
+#define ADPCM_BLOCK_SAMPLES 256
+#define ADPCM_BLOCK_BYTES (4 + ADPCM_BLOCK_SAMPLES / 2)
+
+const int8_t adpcmIndexTable[8] = {-1, -1, -1, -1, 2, 4, 6, 8};
+const int16_t adpcmStepTable[89] = {
+    7,     8,     9,     10,    11,    12,    13,    14,    16,    17,
+    19,    21,    23,    25,    28,    31,    34,    37,    41,    45,
+    50,    55,    60,    66,    73,    80,    88,    97,    107,   118,
+    130,   143,   157,   173,   190,   209,   230,   253,   279,   307,
+    337,   371,   408,   449,   494,   544,   598,   658,   724,   796,
+    876,   963,   1060,  1166,  1282,  1411,  1552,  1707,  1878,  2066,
+    2272,  2499,  2749,  3024,  3327,  3660,  4026,  4428,  4871,  5358,
+    5894,  6484,  7132,  7845,  8630,  9493,  10442, 11487, 12635, 13899,
+    15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794, 32767};
+
+// Decoder state, only touched from the ISR. pos is the next sample to
+// decode; pred and prev hold samples pos - 1 and pos - 2.
+struct AdpcmState {
+  const volatile uint8_t* base;
+  uint32_t pos;
+  int32_t pred;
+  int32_t prev;
+  int32_t index;
+};
+AdpcmState adpcm = {nullptr, 0, 0, 0, 0};
+
+// Sequential reads (the ISR asks for idx and idx + 1, idx never moving
+// back) cost one or two nibble decodes; anything else seeks to the block
+// header holding idx.
+int16_t readADPCM(const volatile uint8_t* base, uint32_t idx) {
+  AdpcmState& st = adpcm;
+  if (st.base == base) {
+    if (idx + 1 == st.pos) return int16_t(st.pred);
+    if (idx + 2 == st.pos) return int16_t(st.prev);
+  }
+  if (st.base != base || idx < st.pos ||
+      idx / ADPCM_BLOCK_SAMPLES > st.pos / ADPCM_BLOCK_SAMPLES) {
+    uint32_t block = idx / ADPCM_BLOCK_SAMPLES;
+    const volatile uint8_t* hdr = base + block * ADPCM_BLOCK_BYTES;
+    st.base = base;
+    st.pos = block * ADPCM_BLOCK_SAMPLES;
+    st.pred = int16_t(hdr[0] | (hdr[1] << 8));
+    st.prev = st.pred;
+    st.index = hdr[2];
+  }
+  while (st.pos <= idx) {
+    uint32_t inBlock = st.pos % ADPCM_BLOCK_SAMPLES;
+    uint8_t byte = base[(st.pos / ADPCM_BLOCK_SAMPLES) * ADPCM_BLOCK_BYTES +
+                        4 + (inBlock >> 1)];
+    uint8_t code = (inBlock & 1) ? (byte >> 4) : (byte & 0x0F);
+
+    int32_t step = adpcmStepTable[st.index];
+    int32_t diff = step >> 3;
+    if (code & 4) diff += step;
+    if (code & 2) diff += step >> 1;
+    if (code & 1) diff += step >> 2;
+    int32_t pred = (code & 8) ? st.pred - diff : st.pred + diff;
+    if (pred > 32767) pred = 32767;
+    if (pred < -32768) pred = -32768;
+    int32_t index = st.index + adpcmIndexTable[code & 7];
+    if (index < 0) index = 0;
+    if (index > 88) index = 88;
+
+    st.prev = st.pred;
+    st.pred = pred;
+    st.index = index;
+    st.pos++;
+  }
+  return int16_t(st.pred);
+}
+
+// Indexed by SAMPLE_FMT_* from samples.h
+const PcmReader pcmReaders[] = {readPCM, readPCM10, readPCM8, readADPCM};
+volatile PcmReader curRead = readPCM;
+
+// The reader for sample idx: readPCMAligned for 16-bit PCM that starts on
+// an even address, otherwise the one for its storage format
+PcmReader readerFor(uint8_t idx) {
+  uint8_t fmt = sample_formats[idx];
+  bool aligned = ((uintptr_t)samples[idx] & 1) == 0;
+#if defined(SAMPLE_CHUNKS) && !defined(SAMPLE_CHUNKS_ALIGNED)
+  aligned = false;  // older pool: later chunks may sit at odd offsets
+#endif
+  return (fmt == SAMPLE_FMT_PCM16 && aligned) ? readPCMAligned : pcmReaders[fmt];
+}
+
+// How the ISR reads the current sample, chosen once per trigger: plain
+// 16-bit PCM is read inline, everything else calls curRead (through
+// readSample() in a chunked bank)
+enum ReadPath : uint8_t { READ_PCM16, READ_PCM16_ALIGNED, READ_VIA_READER };
+volatile ReadPath curPath = READ_PCM16;
+
+ReadPath pathFor(uint8_t idx) {
+#ifdef SAMPLE_CHUNKS
+  (void)idx;
+  return READ_VIA_READER;
+#else
+  if (sample_formats[idx] != SAMPLE_FMT_PCM16) return READ_VIA_READER;
+  return ((uintptr_t)samples[idx] & 1) ? READ_PCM16 : READ_PCM16_ALIGNED;
+#endif
+}
+
+#ifdef SAMPLE_CHUNKS
+// Deduplicated bank (see tools/dedup.py): a sample is a run of chunks in
+// sample_pool, each readable with the sample's own format reader. The
+// cursor caches the chunk holding samples [start, end); playback walks
+// forward, so only reads crossing a chunk edge search the index.
+struct ChunkCursor {
+  uint32_t first, last;  // the current sample's chunks, [first, last)
+  uint32_t start, end;
+  const volatile uint8_t* base;
+};
+ChunkCursor chunkCursor = {0, 0, 0, 0, nullptr};
+
+void selectChunks(uint8_t sample) {
+  chunkCursor.first = sample_chunk_first[sample];
+  chunkCursor.last = sample_chunk_first[sample + 1];
+  chunkCursor.start = chunkCursor.end = 0;  // empty: the first read searches
+}
+
+int16_t readSample(PcmReader read, uint32_t idx) {
+  ChunkCursor& c = chunkCursor;
+  if (idx < c.start || idx >= c.end) {
+    // Last chunk starting at or before idx
+    uint32_t lo = c.first, hi = c.last - 1;
+    while (lo < hi) {
+      uint32_t mid = (lo + hi + 1) >> 1;
+      if (chunk_starts[mid] <= idx)
+        lo = mid;
+      else
+        hi = mid - 1;
+    }
+    c.start = chunk_starts[lo];
+    c.end = (lo + 1 < c.last) ? chunk_starts[lo + 1] : curLen16;
+    c.base = sample_pool + chunk_offsets[lo];
+  }
+  return read(c.base, idx - c.start);
+}
+#else
+static inline int16_t readSample(PcmReader read, uint32_t idx) {
+  return read(curSample, idx);
+}
+#endif
+
 void on_pwm_wrap() {
   pwm_clear_irq(sliceIRQ);
 
@@ -78,8 +254,23 @@ void on_pwm_wrap() {
     return;
   }
 
-  int16_t s1 = readPCM(curSample, idx);
-  int16_t s2 = (idx + 1 < curLen16) ? readPCM(curSample, idx + 1) : 0;
+  int16_t s1, s2;
+  bool hasNext = idx + 1 < curLen16;
+  switch (curPath) {
+    case READ_PCM16_ALIGNED:
+      s1 = readPCMAligned(curSample, idx);
+      s2 = hasNext ? readPCMAligned(curSample, idx + 1) : 0;
+      break;
+    case READ_PCM16:
+      s1 = readPCM(curSample, idx);
+      s2 = hasNext ? readPCM(curSample, idx + 1) : 0;
+      break;
+    default: {
+      PcmReader read = curRead;
+      s1 = readSample(read, idx);
+      s2 = hasNext ? readSample(read, idx + 1) : 0;
+    }
+  }
   int32_t mix =
       ((int32_t)s1 * ((1UL << FRAC_BITS) - frac) + (int32_t)s2 * frac) >>
       FRAC_BITS;
@@ -132,6 +323,11 @@ void onTrigger() {
   uint8_t idx = selectSampleIndex();
   curSample = samples[idx];
   curLen16 = sample_lengths[idx];
+  curRead = readerFor(idx);
+  curPath = pathFor(idx);
+#ifdef SAMPLE_CHUNKS
+  selectChunks(idx);
+#endif
 
   uint16_t raw = analogRead(A0);
   float rate = 0.5f + (raw / 1023.0f);
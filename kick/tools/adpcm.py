@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# adpcm.py — blocked IMA‑ADPCM (4‑bit) encoder and reference decoder
+# MIT‑like license, standard library only
+#
+# Stream layout, repeated per block of BLOCK_SAMPLES samples:
+#   int16 LE  predictor   decoder state before the block's first sample
+#   uint8     step index  decoder state before the block's first sample
+#   uint8     0           padding (keeps blocks 4‑byte aligned)
+#   BLOCK_SAMPLES / 2 bytes of codes, low nibble first
+# The header is a snapshot of the running state, so decoding straight
+# through a block boundary and seeking to a block give identical samples.
+# Keep in sync with readADPCM in kick/src/main.cpp.
+
+from array import array
+from typing import List, Optional, Tuple
+
+BLOCK_SAMPLES = 256
+BLOCK_BYTES = 4 + BLOCK_SAMPLES // 2
+
+INDEX_TABLE = (-1, -1, -1, -1, 2, 4, 6, 8)
+STEP_TABLE = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+)
+
+
+def _step(pred: int, index: int, code: int) -> Tuple[int, int]:
+    """Apply one 4‑bit code to the decoder state; returns (predictor, index)."""
+    step = STEP_TABLE[index]
+    diff = step >> 3
+    if code & 4:
+        diff += step
+    if code & 2:
+        diff += step >> 1
+    if code & 1:
+        diff += step >> 2
+    pred = pred - diff if code & 8 else pred + diff
+    pred = -32768 if pred < -32768 else 32767 if pred > 32767 else pred
+    index += INDEX_TABLE[code & 7]
+    index = 0 if index < 0 else 88 if index > 88 else index
+    return pred, index
+
+
+class AdpcmEncoder:
+    """Chunked encoder: feed int16 samples, get whole blocks back."""
+
+    def __init__(self):
+        self.pred = 0
+        self.index = 0
+        self._pending: List[int] = []
+
+    def _encode_block(self, samples: List[int]) -> bytes:
+        pred, index = self.pred, self.index
+        out = bytearray(BLOCK_BYTES)
+        out[0:2] = (pred & 0xFFFF).to_bytes(2, "little")
+        out[2] = index
+        for i, x in enumerate(samples):
+            step = STEP_TABLE[index]
+            diff = x - pred
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            if diff >= step:
+                code |= 4
+                diff -= step
+            step >>= 1
+            if diff >= step:
+                code |= 2
+                diff -= step
+            step >>= 1
+            if diff >= step:
+                code |= 1
+            # Track the decoder, not the input, so quantisation error never accumulates
+            pred, index = _step(pred, index, code)
+            out[4 + (i >> 1)] |= code << 4 if i & 1 else code
+        self.pred, self.index = pred, index
+        return bytes(out)
+
+    def encode(self, samples: List[int]) -> bytes:
+        self._pending.extend(samples)
+        blocks = []
+        whole = len(self._pending) - len(self._pending) % BLOCK_SAMPLES
+        for b in range(0, whole, BLOCK_SAMPLES):
+            blocks.append(self._encode_block(self._pending[b:b + BLOCK_SAMPLES]))
+        del self._pending[:whole]
+        return b"".join(blocks)
+
+    def flush(self) -> bytes:
+        """Encode the final partial block, padded with silence."""
+        if not self._pending:
+            return b""
+        block = self._pending + [0] * (BLOCK_SAMPLES - len(self._pending))
+        self._pending = []
+        return self._encode_block(block)
+
+
+def decode(data: bytes, frames: Optional[int] = None) -> array:
+    """Reference decoder: every sample of every whole block, as int16.
+
+    frames, the encoder's sample count, drops the silence padding the last
+    block, as the firmware stops at *_LEN.
+    """
+    out = array("h")
+    for b in range(0, len(data) - len(data) % BLOCK_BYTES, BLOCK_BYTES):
+        pred = int.from_bytes(data[b:b + 2], "little", signed=True)
+        index = data[b + 2]
+        for byte in data[b + 4:b + BLOCK_BYTES]:
+            pred, index = _step(pred, index, byte & 0x0F)
+            out.append(pred)
+            pred, index = _step(pred, index, byte >> 4)
+            out.append(pred)
+    if frames is not None:
+        del out[frames:]
+    return out
+
+
+def decode_from(data: bytes, start: int, count: int) -> array:
+    """Decode count samples starting at sample start, seeking via the block header."""
+    block = start // BLOCK_SAMPLES
+    skip = start - block * BLOCK_SAMPLES
+    first = block * BLOCK_BYTES
+    n_blocks = -(-(skip + count) // BLOCK_SAMPLES)
+    return decode(data[first:first + n_blocks * BLOCK_BYTES])[skip:skip + count]
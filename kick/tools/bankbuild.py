@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# bankbuild.py — build firmware sample banks from a TOML or JSON manifest
+# MIT‑like license, standard library only
+#
+# A manifest lists one or more banks, each written to its own directory as
+# sampleNN.h + samples.h or sampleNN.bin + samples.S + samples.h.  There is
+# no limit on samples per bank; unchanged samples are skipped through the
+# same build cache convert.py uses, and the rest convert in parallel.
+#
+#   [defaults]              # any sample option; inherited by every bank
+#   rate = "isr"
+#
+#   [[bank]]
+#   name = "kick"
+#   output = "../src/samples"           # relative to the manifest
+#   emit = "incbin"                     # or "headers"
+#   dedup = true                        # incbin only: store repeated chunks once
+#   [bank.defaults]                     # per-bank overrides of [defaults]
+#   trim = true
+#   [[bank.sample]]
+#   file = "../samples/BD_*.wav"        # a glob adds every match, sorted
+#   [[bank.sample]]
+#   file = "../samples/Cym_8R8_ChromaST2_mono.wav"
+#   name = "cymbal"                     # C identifier; default sampleNN
+#   codec = "adpcm"
+#
+# Sample options: rate ("isr" or Hz), bits (16/10/8), codec ("pcm"/"adpcm"),
+# dither, trim, trim_db, max_seconds.  JSON manifests have the same shape,
+# with "bank" a list and "sample" a list inside each bank.
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import convert
+import dedup
+import headers
+import pcmformat
+import trim
+import watch
+from buildcache import BuildCache
+from errors import BatchError, ConversionError, ManifestError, ToolError
+
+SAMPLE_KEYS = {"rate", "bits", "codec", "dither", "trim", "trim_db", "max_seconds"}
+BANK_KEYS = {"name", "output", "emit", "incbin_prefix", "dedup", "defaults", "sample"}
+EMITS = ("headers", "incbin")
+_C_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+@dataclass
+class SampleSpec:
+    path: Path
+    name: str
+    options: convert.ConvertOptions
+
+
+@dataclass
+class BankSpec:
+    name: str
+    output_dir: Path
+    emit: str
+    incbin_prefix: Optional[str] = None
+    dedup: bool = False
+    samples: List[SampleSpec] = field(default_factory=list)
+
+
+def _sample_options(settings: Dict[str, Any], emit: str, where: str) -> convert.ConvertOptions:
+    """ConvertOptions for one sample from its merged settings."""
+    unknown = set(settings) - SAMPLE_KEYS
+    if unknown:
+        raise ManifestError(f"{where}: unknown option(s) {', '.join(sorted(unknown))}")
+    try:
+        rate = settings.get("rate")
+        rate = convert.parse_rate(str(rate)) if rate is not None else None
+    except argparse.ArgumentTypeError as e:
+        raise ManifestError(f"{where}: {e}") from None
+    bits = settings.get("bits", 16)
+    codec = settings.get("codec", "pcm")
+    if codec not in ("pcm", "adpcm"):
+        raise ManifestError(f"{where}: codec must be 'pcm' or 'adpcm', got {codec!r}")
+    if bits not in pcmformat.FORMAT_FOR_BITS:
+        raise ManifestError(f"{where}: bits must be one of {sorted(pcmformat.FORMAT_FOR_BITS)}, got {bits!r}")
+    if codec == "adpcm" and bits != 16:
+        raise ManifestError(f"{where}: bits applies to codec 'pcm' only")
+    return convert.ConvertOptions(
+        max_seconds=int(settings.get("max_seconds", convert.MAX_SECONDS)),
+        fmt="c16" if emit == "headers" else "hex",
+        emit=emit,
+        rate=rate,
+        storage="adpcm" if codec == "adpcm" else pcmformat.FORMAT_FOR_BITS[bits],
+        dither=bool(settings.get("dither", True)),
+        trim_silence=bool(settings.get("trim", False)),
+        trim_db=float(settings.get("trim_db", trim.THRESHOLD_DBFS)),
+    )
+
+
+def load_manifest(path: Path) -> List[BankSpec]:
+    """Parse a .toml or .json manifest into banks, resolving globs relative to it."""
+    try:
+        if path.suffix.lower() == ".json":
+            data = json.loads(path.read_text())
+        else:
+            try:
+                import tomllib  # Python 3.11+; JSON manifests work on any version
+            except ImportError:
+                raise ManifestError("TOML manifests need Python 3.11+; use JSON") from None
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+    except (OSError, ValueError) as e:  # tomllib.TOMLDecodeError and JSONDecodeError are ValueErrors
+        raise ManifestError(f"Cannot read {path}: {e}") from e
+
+    base = path.parent
+    defaults = data.get("defaults", {})
+    banks = []
+    for b, raw in enumerate(data.get("bank", [])):
+        where = f"{path}: bank {raw.get('name', b + 1)}"
+        unknown = set(raw) - BANK_KEYS
+        if unknown:
+            raise ManifestError(f"{where}: unknown key(s) {', '.join(sorted(unknown))}")
+        if "output" not in raw:
+            raise ManifestError(f"{where}: missing 'output'")
+        emit = raw.get("emit", "incbin")
+        if emit not in EMITS:
+            raise ManifestError(f"{where}: emit must be one of {', '.join(EMITS)}, got {emit!r}")
+        dedup_chunks = bool(raw.get("dedup", False))
+        if dedup_chunks and emit != "incbin":
+            raise ManifestError(f"{where}: dedup needs emit = \"incbin\"")
+        bank = BankSpec(str(raw.get("name", f"bank{b + 1}")), base / raw["output"], emit, raw.get("incbin_prefix"),
+                        dedup_chunks)
+        bank_defaults = {**defaults, **raw.get("defaults", {})}
+        options_cache: Dict[str, convert.ConvertOptions] = {}
+        for s, entry in enumerate(raw.get("sample", [])):
+            entry = {"file": entry} if isinstance(entry, str) else dict(entry)
+            pattern = entry.pop("file", None)
+            name = entry.pop("name", None)
+            if pattern is None:
+                raise ManifestError(f"{where}: sample {s + 1} has no 'file'")
+            settings = {**bank_defaults, **entry}
+            # Thousands of samples usually share a handful of option sets
+            key = json.dumps(settings, sort_keys=True)
+            if key not in options_cache:
+                options_cache[key] = _sample_options(settings, emit, f"{where}, sample {s + 1}")
+            matches = sorted(glob.glob(str(base / pattern))) if glob.has_magic(pattern) else [str(base / pattern)]
+            if not matches:
+                raise ManifestError(f"{where}: {pattern} matches no files")
+            if name is not None and len(matches) != 1:
+                raise ManifestError(f"{where}: 'name' needs a single file, {pattern} matches {len(matches)}")
+            for m in matches:
+                bank.samples.append(SampleSpec(Path(m), name or "", options_cache[key]))
+
+        names = set()
+        for i, sample in enumerate(bank.samples):
+            sample.name = sample.name or headers.sample_name_for(i)
+            if not _C_IDENTIFIER.match(sample.name):
+                raise ManifestError(f"{where}: {sample.name!r} is not a C identifier")
+            if sample.name in names:
+                raise ManifestError(f"{where}: sample name {sample.name} is used twice")
+            names.add(sample.name)
+        if not bank.samples:
+            raise ManifestError(f"{where}: no samples")
+        banks.append(bank)
+    if not banks:
+        raise ManifestError(f"{path}: no [[bank]] entries")
+    return banks
+
+
+@dataclass
+class BankResult:
+    """What build_bank did."""
+    name: str
+    samples: int
+    converted: List[convert.ConversionResult]
+    master_file: Path
+    seconds: float
+    dedup_stats: Optional[dedup.DedupStats] = None
+
+    @property
+    def up_to_date(self) -> int:
+        return self.samples - len(self.converted)
+
+    def summary(self) -> str:
+        line = (f"Bank {self.name}: {self.samples} samples ({len(self.converted)} converted, "
+                f"{self.up_to_date} up to date) → {self.master_file} in {self.seconds:.2f} s")
+        if self.dedup_stats:
+            line += f"\nBank {self.name}: {self.dedup_stats.summary()}"
+        return line
+
+
+def _build_job(in_path: Path, output_dir: Path, options: convert.ConvertOptions,
+               name: str) -> Tuple[Optional[convert.ConversionResult], Optional[str]]:
+    """Worker entry point: never raises, so one bad file cannot take the pool down."""
+    try:
+        return convert.convert_file(in_path, output_dir, options, name), None
+    except ConversionError as e:
+        return None, str(e)
+
+
+def build_bank(bank: BankSpec, jobs: int = 0, force: bool = False,
+               on_done: Optional[convert.OnDone] = None) -> BankResult:
+    """Convert a bank's stale samples and write its master files.
+
+    on_done sees each converted sample's outcome.  Raises ConversionError
+    for a missing input and BatchError, after caching the samples that did
+    convert, if any sample failed.
+    """
+    start = time.perf_counter()
+    for sample in bank.samples:
+        if not sample.path.exists():
+            raise ConversionError(f"{bank.name}: file not found: {sample.path}")
+
+    cache = BuildCache(bank.output_dir)
+    pending = [s for s in bank.samples
+               if force or not cache.is_fresh(s.path, s.options.cache_key(),
+                                             convert.output_path_for(s.path, bank.output_dir, s.name, bank.emit))]
+    converted: List[convert.ConversionResult] = []
+    failures = []
+    workers = min(jobs or os.cpu_count() or 1, max(1, len(pending)))
+    args = ([s.path for s in pending], [bank.output_dir] * len(pending), [s.options for s in pending],
+            [s.name for s in pending])
+    try:
+        with ProcessPoolExecutor(max_workers=workers) if workers != 1 else nullcontext() as pool:
+            if pool is None:
+                results = map(_build_job, *args)
+            else:
+                # Batch the hand-offs: per-task IPC dominates for thousands of short samples
+                results = pool.map(_build_job, *args, chunksize=max(1, len(pending) // (workers * 8)))
+            for sample, (result, error) in zip(pending, results):
+                if error is not None:
+                    failures.append((sample.path, error))
+                else:
+                    cache.record(sample.path, sample.options.cache_key(), result.out_path, result.frames)
+                    converted.append(result)
+                if on_done:
+                    on_done(sample.path, result, error)
+    finally:
+        cache.save()
+    if failures:
+        raise BatchError(f"{bank.name}: {len(failures)} of {len(pending)} sample(s) failed", failures)
+
+    names = [s.name for s in bank.samples]
+    formats = [s.options.storage for s in bank.samples]
+    lengths = [cache.frames(convert.output_path_for(s.path, bank.output_dir, s.name, bank.emit))
+               for s in bank.samples]
+    dedup_stats = None
+    if bank.emit == "headers":
+        master_file = headers.write_master_header(bank.output_dir, names)
+    elif bank.dedup:
+        master_file, dedup_stats = dedup.write_dedup_bank(bank.output_dir, names, bank.incbin_prefix, formats,
+                                                          lengths)
+    else:
+        master_file = headers.write_incbin_bank(bank.output_dir, names, bank.incbin_prefix, formats, lengths)
+    return BankResult(bank.name, len(bank.samples), converted, master_file, time.perf_counter() - start,
+                      dedup_stats)
+
+
+def select_banks(path: Path, only: Optional[List[str]] = None) -> List[BankSpec]:
+    """The banks of the manifest at path, or just those named in only."""
+    banks = load_manifest(path)
+    if only:
+        missing = set(only) - {b.name for b in banks}
+        if missing:
+            raise ManifestError(f"no bank named {', '.join(sorted(missing))} in {path}")
+        banks = [b for b in banks if b.name in only]
+    return banks
+
+
+def build_manifest(path: Path, jobs: int = 0, force: bool = False, only: Optional[List[str]] = None,
+                   on_done: Optional[convert.OnDone] = None) -> List[BankResult]:
+    """Build the banks of the manifest at path, stopping at the first that fails (see build_bank)."""
+    return [build_bank(bank, jobs, force, on_done) for bank in select_banks(path, only)]
+
+
+def _print_errors(in_path: Path, result: Optional[convert.ConversionResult], error: Optional[str]) -> None:
+    if error is not None:
+        print(f"Error: {error}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build one firmware sample bank per target from a TOML or JSON manifest",
+        epilog="See the comment at the top of bankbuild.py for the manifest format."
+    )
+    parser.add_argument("manifest", type=Path, help="Bank manifest (.toml or .json)")
+    parser.add_argument("--bank", action="append",
+                        help="Only build the named bank (repeat for several; default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Worker processes per bank (0 = one per CPU, default: 0)")
+    parser.add_argument("--force", action="store_true", help="Reconvert every sample even if up to date")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Report every converted sample")
+    parser.add_argument("--watch", action="store_true",
+                        help="After building, keep polling the manifest, the samples and their directories "
+                             "and rebuild (only what changed) when they do; Ctrl+C stops")
+    args = parser.parse_args()
+
+    if args.jobs < 0:
+        print(f"Error: --jobs must be 0 or greater, got {args.jobs}", file=sys.stderr)
+        sys.exit(1)
+    on_done = convert.print_outcome(verbose=True) if args.verbose else _print_errors
+    watched = [args.manifest]
+
+    def build(force: bool) -> bool:
+        try:
+            banks = select_banks(args.manifest, args.bank)
+            # Directories too, so samples added to a glob's directory are seen
+            paths = {s.path for bank in banks for s in bank.samples}
+            watched[:] = [args.manifest, *sorted(paths), *sorted({p.parent for p in paths})]
+            for bank in banks:
+                print(build_bank(bank, args.jobs, force, on_done).summary())
+        except ToolError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+        return True
+
+    ok = build(args.force)
+    if not args.watch:
+        if not ok:
+            sys.exit(1)
+        return
+
+    def rebuild(changed: Iterable[Path]) -> None:
+        start = time.perf_counter()
+        names = sorted(p.name for p in changed)
+        print(f"\nChanged: {', '.join(names[:5])}" + (f" and {len(names) - 5} more" if len(names) > 5 else ""))
+        if build(force=False):
+            print(f"Rebuilt in {1000 * (time.perf_counter() - start):.0f} ms")
+
+    print(f"\nWatching {args.manifest} and {len(watched) - 1} sample file(s) and directories (Ctrl+C to stop)")
+    try:
+        watch.watch(lambda: watch.stat_files(watched), rebuild)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()
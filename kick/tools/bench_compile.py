@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# bench_compile.py — compile time and compiler memory for each sample bank format
+# MIT‑like license, standard library only
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import headers
+import split_samples
+from convert import ConversionError, ConvertOptions, convert_file
+from errors import SplitError
+
+# Stand‑in for main.cpp: pulls in the bank and keeps every table referenced
+MAIN_CPP = """#include "samples/samples.h"
+
+const void* bench_keep(unsigned i) {
+  return i < NUM_SAMPLES ? (const void*)samples[i] : (const void*)&sample_lengths[0];
+}
+"""
+
+# Host compilers have no Arduino core; this is all the generated headers need
+PGMSPACE_STUB = """#pragma once
+#include <stdint.h>
+#ifndef PROGMEM
+#define PROGMEM
+#endif
+"""
+
+
+def _convert_bank(wavs: List[Path], out_dir: Path, emit: str, max_seconds: int, fmt: str = "c16") -> List[str]:
+    names = [headers.sample_name_for(i) for i in range(len(wavs))]
+    options = ConvertOptions(max_seconds=max_seconds, fmt=fmt, emit=emit)
+    for wav, name in zip(wavs, names):
+        convert_file(wav, out_dir, options, name)
+    return names
+
+
+def build_headers(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """Brace‑initialised sampleNN.h arrays, all included into main.cpp."""
+    names = _convert_bank(wavs, src / "samples", "headers", max_seconds)
+    headers.write_master_header(src / "samples", names)
+    return [src / "main.cpp"]
+
+
+def build_strings(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """sampleNN.h arrays initialised from string literals, all included into main.cpp."""
+    names = _convert_bank(wavs, src / "samples", "headers", max_seconds, fmt="str")
+    headers.write_master_header(src / "samples", names)
+    return [src / "main.cpp"]
+
+
+def build_int16(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """int16_t sampleNN.h arrays (-f i16), all included into main.cpp."""
+    names = _convert_bank(wavs, src / "samples", "headers", max_seconds, fmt="i16")
+    headers.write_master_header(src / "samples", names, "int16_t")
+    return [src / "main.cpp"]
+
+
+def build_incbin(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """Raw sampleNN.bin pulled in by samples.S."""
+    names = _convert_bank(wavs, src / "samples", "incbin", max_seconds)
+    headers.write_incbin_bank(src / "samples", names)
+    return [src / "main.cpp", src / "samples" / headers.INCBIN_ASM]
+
+
+def _split_units(wavs: List[Path], src: Path, max_seconds: int, fmt: str) -> List[Path]:
+    names = _convert_bank(wavs, src / "pasted", "headers", max_seconds)
+    pasted = src / "pasted" / "sample.h"
+    pasted.write_text("".join((src / "pasted" / f"{name}.h").read_text() for name in names))
+    result = split_samples.extract_samples(pasted, src / "samples", emit="units", fmt=fmt)
+    return [src / "main.cpp", *result.outputs]
+
+
+def build_units(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """One sampleNN.cpp per sample, as split_samples.py --emit units writes them."""
+    return _split_units(wavs, src, max_seconds, "c16")
+
+
+def build_units_str(wavs: List[Path], src: Path, max_seconds: int) -> List[Path]:
+    """One sampleNN.cpp per sample, initialised from string literals (--emit units -f str)."""
+    return _split_units(wavs, src, max_seconds, "str")
+
+
+FORMS: Dict[str, Callable[[List[Path], Path, int], List[Path]]] = {
+    "headers": build_headers,
+    "incbin": build_incbin,
+    "units": build_units,
+    "strings": build_strings,
+    "int16": build_int16,
+    "units-str": build_units_str,
+}
+
+
+def compile_one(cmd: List[str]) -> Tuple[float, int]:
+    """Run one compiler command; return (seconds, peak RSS in KiB of it and its children)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise SystemExit(f"Compiler failed ({proc.returncode}): {shlex.join(cmd)}")
+    return elapsed, usage.ru_maxrss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare compile time of the generated sample bank formats")
+    parser.add_argument("files", nargs="+", type=Path, help="WAV files for the bank (e.g. samples/*.wav)")
+    parser.add_argument("--cxx", default=os.environ.get("CXX", "g++"),
+                        help="C++ compiler driver, also used for .S files (default: $CXX or g++)")
+    parser.add_argument("--flags", default="-O2", help="Extra compiler flags (default: -O2)")
+    parser.add_argument("--forms", default=",".join(FORMS),
+                        help=f"Comma-separated formats to compare (default: {','.join(FORMS)})")
+    parser.add_argument("--max-seconds", type=int, default=20, help="Seconds kept per sample (default: 20)")
+    args = parser.parse_args()
+
+    forms = [f.strip() for f in args.forms.split(",") if f.strip()]
+    for form in forms:
+        if form not in FORMS:
+            parser.error(f"unknown form {form!r}; choose from {', '.join(FORMS)}")
+
+    # longest = the slowest single file: the wall time of a parallel build, and of a
+    # rebuild after editing one sample when each sample is a file of its own
+    print(f"{'form':<10} {'files':>5} {'seconds':>9} {'longest':>9} {'peak RSS MiB':>13}")
+    with tempfile.TemporaryDirectory(prefix="bench_compile_") as tmp:
+        stub = Path(tmp) / "stub"
+        stub.mkdir()
+        (stub / "pgmspace.h").write_text(PGMSPACE_STUB)
+        for form in forms:
+            src = Path(tmp) / form / "src"
+            (src / "samples").mkdir(parents=True)
+            (src / "main.cpp").write_text(MAIN_CPP)
+            try:
+                sources = FORMS[form](args.files, src, args.max_seconds)
+            except (ConversionError, SplitError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+
+            total, longest, peak = 0.0, 0.0, 0
+            for source in sources:
+                obj = source.with_suffix(source.suffix + ".o")
+                cmd = [args.cxx, *shlex.split(args.flags), f"-I{stub}", f"-I{src}", "-c", str(source), "-o", str(obj)]
+                seconds, rss = compile_one(cmd)
+                total += seconds
+                longest = max(longest, seconds)
+                peak = max(peak, rss)
+            print(f"{form:<10} {len(sources):>5} {total:>9.2f} {longest:>9.2f} {peak / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
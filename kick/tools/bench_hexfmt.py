@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# bench_hexfmt.py — throughput of hexfmt dialects vs. per‑byte f‑string formatters
+# MIT‑like license, standard library only
+
+import argparse
+import os
+import sys
+import time
+from array import array
+from typing import Callable
+
+import hexfmt
+
+
+def legacy_hex(data: bytes) -> str:
+    """The formatter convert.py and wav_table_gen_v1.py used before hexfmt."""
+    return ",".join(f"0x{b:02X}" for b in data)
+
+
+def legacy_dec(data: bytes) -> str:
+    return ",".join(f"{b}" for b in data)
+
+
+def legacy_c16(data: bytes) -> str:
+    """split_samples.py's 16‑per‑line layout, built the way it builds it."""
+    hex_values = [f"0x{b:02X}" for b in data]
+    formatted_lines = []
+    for i in range(0, len(hex_values), 16):
+        line = ', '.join(hex_values[i:i+16])
+        if i + 16 < len(hex_values):
+            line += ','
+        formatted_lines.append(f"    {line}")
+    return '\n'.join(formatted_lines)
+
+
+def reference_str(data: bytes) -> str:
+    """The str layout built per byte; nothing produced it before hexfmt."""
+    lines = []
+    for i in range(0, len(data), 32):
+        lines.append('    "' + "".join(f"\\x{b:02X}" for b in data[i:i + 32]) + '"')
+    return "\n".join(lines)
+
+
+def reference_i16(data: bytes) -> str:
+    """The i16 layout built per value: little-endian int16, 16 per line."""
+    values = array("h", data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    lines = []
+    for i in range(0, len(values), 16):
+        lines.append("    " + ", ".join(str(v) for v in values[i:i + 16]))
+    return ",\n".join(lines)
+
+
+def best_of(fn: Callable[[bytes], str], data: bytes, repeat: int) -> float:
+    """Return the fastest wall time of repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hexfmt against per-byte formatters, checking "
+                                                 "each dialect's output against its reference")
+    parser.add_argument("--mb", type=float, default=4.0, help="Size of the random payload in MB (default: 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    data = os.urandom(int(args.mb * 1_000_000) & ~1)  # whole int16 values for i16
+    mb = len(data) / 1_000_000
+
+    print(f"{'dialect':<8} {'per-byte MB/s':>14} {'hexfmt MB/s':>12} {'speedup':>8}")
+    baselines = (("hex", legacy_hex), ("c16", legacy_c16), ("dec", legacy_dec),
+                 ("str", reference_str), ("i16", reference_i16))
+    for name, baseline in baselines:
+        dialect = hexfmt.DIALECTS[name]
+        if hexfmt.format_bytes(data, dialect) != baseline(data):
+            raise SystemExit(f"Output mismatch for dialect {name}")
+        t_old = best_of(baseline, data, args.repeat)
+        t_new = best_of(lambda d: hexfmt.format_bytes(d, dialect), data, args.repeat)
+        print(f"{name:<8} {mb / t_old:>14.1f} {mb / t_new:>12.1f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# bench_isr.py — host microbenchmark of the playback ISR's read + interpolation kernel
+# MIT‑like license, standard library only
+#
+# Compiles the body of on_pwm_wrap() from kick/src/main.cpp for the host
+# and times each way it reads 16‑bit PCM: readPCM (two byte loads) and
+# readPCMAligned (one halfword load) inline, as the firmware does for plain
+# 16‑bit samples, and readPCMAligned through the PcmReader pointer the
+# other formats and chunked banks use.  The host has no XIP flash or cache
+# misses, so the figures compare instruction work per interrupt, not RP2040
+# cycles; every path must produce the same PWM levels, which is checked.
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Kept in step with kick/src/main.cpp: readers, interpolation and PWM level
+KERNEL_CPP = r"""#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+#define FRAC_BITS 12
+#define FRAC_MASK ((1UL << FRAC_BITS) - 1)
+
+typedef int16_t (*PcmReader)(const volatile uint8_t* base, uint32_t idx);
+
+int16_t readPCM(const volatile uint8_t* base, uint32_t idx) {
+  uint32_t byteIndex = idx << 1;
+  return int16_t(base[byteIndex] | (base[byteIndex + 1] << 8));
+}
+
+int16_t readPCMAligned(const volatile uint8_t* base, uint32_t idx) {
+  return ((const volatile int16_t*)base)[idx];
+}
+
+enum ReadPath : uint8_t { READ_PCM16, READ_PCM16_ALIGNED, READ_VIA_READER };
+
+volatile PcmReader curRead;
+volatile ReadPath curPath;
+volatile const uint8_t* curSample;
+volatile uint32_t curLen16;
+volatile uint32_t tblAcc;
+volatile uint32_t tblStepFP;
+volatile uint16_t pwmLevel;
+
+// on_pwm_wrap() without the PWM registers; returns false once the sample ends
+static inline bool tick() {
+  uint32_t idx = tblAcc >> FRAC_BITS;
+  uint32_t frac = tblAcc & FRAC_MASK;
+  if (idx >= curLen16) return false;
+
+  int16_t s1, s2;
+  bool hasNext = idx + 1 < curLen16;
+  switch (curPath) {
+    case READ_PCM16_ALIGNED:
+      s1 = readPCMAligned(curSample, idx);
+      s2 = hasNext ? readPCMAligned(curSample, idx + 1) : 0;
+      break;
+    case READ_PCM16:
+      s1 = readPCM(curSample, idx);
+      s2 = hasNext ? readPCM(curSample, idx + 1) : 0;
+      break;
+    default: {
+      PcmReader read = curRead;
+      s1 = read(curSample, idx);
+      s2 = hasNext ? read(curSample, idx + 1) : 0;
+    }
+  }
+  int32_t mix =
+      ((int32_t)s1 * ((1UL << FRAC_BITS) - frac) + (int32_t)s2 * frac) >>
+      FRAC_BITS;
+  int16_t interpolated = int16_t(mix);
+
+  pwmLevel = uint16_t(int32_t(interpolated) + 32768) >> 6;
+  tblAcc += tblStepFP;
+  return true;
+}
+
+static double now() {
+  timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+int main(int argc, char** argv) {
+  uint32_t frames = (uint32_t)strtoul(argv[1], 0, 10);
+  int repeat = atoi(argv[2]);
+  // Halfword aligned, as an int16_t array, .incbin or dedup pool would be
+  int16_t* pcm = new int16_t[frames];
+  uint32_t seed = 0x6EA5;
+  for (uint32_t i = 0; i < frames; i++) {
+    seed = seed * 1664525u + 1013904223u;
+    pcm[i] = int16_t(seed >> 16);
+  }
+  const char* names[] = {"readPCM", "readPCMAligned", "PcmReader*"};
+  const ReadPath paths[] = {READ_PCM16, READ_PCM16_ALIGNED, READ_VIA_READER};
+  // Playback rates the speed pot covers: 0.5x, 1x, 1.5x
+  const uint32_t steps[] = {1u << (FRAC_BITS - 1), 1u << FRAC_BITS, 3u << (FRAC_BITS - 1)};
+  for (int r = 0; r < 3; r++) {
+    double best = 1e30;
+    uint64_t ticks = 0, sum = 0;
+    for (int k = 0; k < repeat; k++) {
+      ticks = sum = 0;
+      double t0 = now();
+      for (uint32_t step : steps) {
+        curRead = readPCMAligned;
+        curPath = paths[r];
+        curSample = (const uint8_t*)pcm;
+        curLen16 = frames;
+        tblAcc = 0;
+        tblStepFP = step;
+        while (tick()) {
+          sum += pwmLevel;
+          ticks++;
+        }
+      }
+      double t = now() - t0;
+      if (t < best) best = t;
+    }
+    printf("%s %llu %.6f %llu\n", names[r], (unsigned long long)ticks, best, (unsigned long long)sum);
+  }
+  delete[] pcm;
+  return 0;
+}
+"""
+
+ISR_HZ = 125e6 / 4096  # PWM wrap rate of the IRQ slice, about 30.5 kHz
+MAX_FRAMES = (1 << (32 - 12)) - 1  # tblAcc is a 32-bit Q20.12 position
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the playback ISR kernel on the host for each 16-bit read path")
+    parser.add_argument("--cxx", default=os.environ.get("CXX", "g++"), help="C++ compiler (default: $CXX or g++)")
+    parser.add_argument("--flags", default="-O2", help="Compiler flags (default: -O2)")
+    parser.add_argument("--frames", type=int, default=1 << 18, help="Sample length in frames (default: 262144)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per read path, best kept (default: 5)")
+    args = parser.parse_args()
+    if not 1 <= args.frames <= MAX_FRAMES:
+        parser.error(f"--frames must be 1..{MAX_FRAMES}, as tblAcc holds at most that many")
+
+    with tempfile.TemporaryDirectory(prefix="bench_isr_") as tmp:
+        source = Path(tmp) / "kernel.cpp"
+        binary = Path(tmp) / "kernel"
+        source.write_text(KERNEL_CPP)
+        cmd = [args.cxx, *shlex.split(args.flags), "-std=c++11", str(source), "-o", str(binary)]
+        if subprocess.run(cmd).returncode != 0:
+            raise SystemExit(f"Compiler failed: {shlex.join(cmd)}")
+        out = subprocess.run([str(binary), str(args.frames), str(args.repeat)],
+                             capture_output=True, text=True, check=True).stdout
+
+    rows = [line.split() for line in out.splitlines()]
+    print(f"{'read path':<16} {'ticks':>10} {'ns/tick':>8} {'host CPU at 30.5 kHz':>21}")
+    for name, ticks, seconds, _ in rows:
+        ns = float(seconds) / int(ticks) * 1e9
+        print(f"{name:<16} {int(ticks):>10} {ns:>8.2f} {ns * 1e-9 * ISR_HZ:>20.3%}")
+    if len({checksum for *_, checksum in rows}) != 1:
+        print("Error: read paths disagree on the PWM levels", file=sys.stderr)
+        sys.exit(1)
+    base, aligned, indirect = (float(s) / int(t) for _, t, s, _ in rows)
+    print(f"readPCMAligned: {base / aligned:.2f}x the speed of readPCM inline, "
+          f"{indirect / aligned:.2f}x its own speed through PcmReader, identical output")
+
+
+if __name__ == "__main__":
+    main()
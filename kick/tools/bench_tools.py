@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# bench_tools.py — end‑to‑end throughput of the sample tools on synthetic WAV corpora
+# MIT‑like license, standard library only
+#
+# Builds a reproducible corpus (file count, duration range, mono/stereo,
+# silence/noise/sweep content), then runs each case in a fresh interpreter
+# so its peak RSS is its own, and writes MB/s, files/s and peak RSS to JSON.
+# Pass --compare with an earlier results file to see what moved.
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import convert
+import headers
+import hexfmt
+import split_samples
+import wavin
+
+CORPUS_MANIFEST = "corpus.json"
+CORPUS_VERSION = 2  # 2: sample.h banks hold whole files; 1 cut them at convert.MAX_SECONDS
+BANK_CHUNK_FRAMES = 1 << 16
+CORPUS_RATE = 44100
+CORPUS_SEED = 0xBE7C
+SIGNALS = ("silence", "noise", "sweep")
+
+# name: (files, min seconds, max seconds) — the extremes the tools must cope with
+PRESETS: Dict[str, Tuple[int, float, float]] = {
+    "small": (18, 0.05, 2.0),
+    "many": (10_000, 0.05, 0.05),
+    "long": (2, 600.0, 600.0),
+    "mixed": (200, 0.05, 30.0),
+}
+
+
+def _sweep_period(rate: int) -> bytes:
+    """One second of a 20 Hz → 20 kHz log sweep at -6 dBFS, tiled for longer files."""
+    f0, f1 = 20.0, 20000.0
+    k = math.log(f1 / f0)
+    samples = array("h", (int(16384 * math.sin(2 * math.pi * f0 * (math.exp(k * n / rate) - 1) / k))
+                          for n in range(rate)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def _signal_bytes(signal: str, frames: int, channels: int, rng: random.Random, sweep: bytes) -> bytes:
+    size = 2 * frames * channels
+    if signal == "silence":
+        return bytes(size)
+    if signal == "noise":
+        return rng.randbytes(size)
+    mono = (sweep * (frames // (len(sweep) // 2) + 1))[:2 * frames]
+    if channels == 1:
+        return mono
+    stereo = bytearray(size)
+    for c in range(channels):
+        for b in range(2):
+            stereo[2 * c + b::2 * channels] = mono[b::2]
+    return bytes(stereo)
+
+
+def build_corpus(directory: Path, files: int, min_seconds: float, max_seconds: float,
+                 channels: List[int], signals: List[str]) -> Dict:
+    """Write the corpus (WAVs plus sample.h batches for split_samples) unless it is already there."""
+    params = {"files": files, "min_seconds": min_seconds, "max_seconds": max_seconds,
+              "channels": channels, "signals": signals, "rate": CORPUS_RATE, "seed": CORPUS_SEED,
+              "version": CORPUS_VERSION}
+    manifest = directory / CORPUS_MANIFEST
+    if manifest.exists():
+        existing = json.loads(manifest.read_text())
+        if existing.get("params") == params:
+            return existing
+
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(CORPUS_SEED)
+    sweep = _sweep_period(CORPUS_RATE)
+    wav_bytes = 0
+    total_seconds = 0.0
+    for i in range(files):
+        # Log-uniform durations so both ends of the range are well represented
+        seconds = math.exp(rng.uniform(math.log(min_seconds), math.log(max_seconds)))
+        frames = max(1, int(seconds * CORPUS_RATE))
+        nch = rng.choice(channels)
+        signal = signals[i % len(signals)]
+        path = directory / f"{i:05d}_{signal}_{nch}ch.wav"
+        with wave.open(str(path), "wb") as w:
+            w.setnchannels(nch)
+            w.setsampwidth(2)
+            w.setframerate(CORPUS_RATE)
+            w.writeframes(_signal_bytes(signal, frames, nch, rng, sweep))
+        wav_bytes += path.stat().st_size
+        total_seconds += frames / CORPUS_RATE
+
+    # split_samples input: one hand-pasted style sample.h per bank of MAX_FILES,
+    # each file whole and streamed, as the long preset's banks run to hundreds of MB
+    wavs = sorted(directory.glob("*.wav"))
+    header_bytes = 0
+    for b in range(0, len(wavs), convert.MAX_FILES):
+        bank = directory / f"bank{b // convert.MAX_FILES:04d}_sample.h"
+        with bank.open("w") as f:
+            f.write("#ifndef SAMPLE_H\n#define SAMPLE_H\n\n#include <pgmspace.h>\n\n")
+            for j, wav in enumerate(wavs[b:b + convert.MAX_FILES]):
+                f.write(f"const uint8_t {headers.sample_name_for(j)}[] PROGMEM = {{ /* <<< data >>> */\n")
+                formatter = hexfmt.StreamFormatter(f, hexfmt.HEX)
+                with wavin.open_wav(wav) as r:
+                    for chunk in iter(lambda: r.readframes(BANK_CHUNK_FRAMES), b""):
+                        formatter.write(chunk)
+                formatter.close()
+                f.write("\n};\n\n")
+            f.write("#endif\n")
+        header_bytes += bank.stat().st_size
+
+    info = {"params": params, "wav_bytes": wav_bytes, "audio_seconds": round(total_seconds, 3),
+            "sample_h_bytes": header_bytes}
+    manifest.write_text(json.dumps(info, indent=2) + "\n")
+    return info
+
+
+# --- cases: each runs in its own interpreter and returns (files, input bytes) ---
+
+def _batches(items: List[Path]) -> List[List[Path]]:
+    return [items[i:i + convert.MAX_FILES] for i in range(0, len(items), convert.MAX_FILES)]
+
+
+def _whole_files(corpus: Path, **fields) -> convert.ConvertOptions:
+    """ConvertOptions with max_seconds covering the corpus's longest file.
+
+    The cases report MB/s over the WAV sizes, so every byte of them has to
+    be converted; the default 20 s cut would inflate the long preset ~30x.
+    """
+    params = json.loads((corpus / CORPUS_MANIFEST).read_text())["params"]
+    return convert.ConvertOptions(max_seconds=math.ceil(params["max_seconds"]), **fields)
+
+
+def case_convert(corpus: Path, work: Path) -> Tuple[int, int]:
+    """convert.py's default: one hex .txt per WAV."""
+    wavs = sorted(corpus.glob("*.wav"))
+    options = _whole_files(corpus)
+    for wav in wavs:
+        convert.convert_file(wav, work, options)
+    return len(wavs), sum(w.stat().st_size for w in wavs)
+
+
+def case_convert_pipeline(corpus: Path, work: Path) -> Tuple[int, int]:
+    """convert.py --pipeline -j0 over the whole corpus."""
+    wavs = sorted(corpus.glob("*.wav"))
+    results, _ = convert.process_files_pipelined(wavs, work, options=_whole_files(corpus), jobs=0)
+    if None in results:
+        raise convert.ConversionError("pipeline run had failures")
+    return len(wavs), sum(w.stat().st_size for w in wavs)
+
+
+def case_headers(corpus: Path, work: Path) -> Tuple[int, int]:
+    """convert.py --emit headers: sampleNN.h per WAV plus samples.h, one bank per MAX_FILES."""
+    wavs = sorted(corpus.glob("*.wav"))
+    options = _whole_files(corpus, fmt="c16", emit="headers")
+    for b, batch in enumerate(_batches(wavs)):
+        out = work / f"bank{b:04d}"
+        names = [headers.sample_name_for(i) for i in range(len(batch))]
+        for wav, name in zip(batch, names):
+            convert.convert_file(wav, out, options, name)
+        headers.write_master_header(out, names)
+    return len(wavs), sum(w.stat().st_size for w in wavs)
+
+
+def case_split(corpus: Path, work: Path) -> Tuple[int, int]:
+    """split_samples.extract_samples on each hand-pasted sample.h."""
+    banks = sorted(corpus.glob("*_sample.h"))
+    for bank in banks:
+        split_samples.extract_samples(bank, work / bank.stem)
+    return len(banks), sum(b.stat().st_size for b in banks)
+
+
+CASES: Dict[str, Callable[[Path, Path], Tuple[int, int]]] = {
+    "convert": case_convert,
+    "convert-pipeline": case_convert_pipeline,
+    "headers": case_headers,
+    "split": case_split,
+}
+
+
+def _run_case_here(name: str, corpus: Path, work: Path) -> None:
+    """Child side: run one case quietly and print its measurements as JSON."""
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        files, size = CASES[name](corpus, work)
+    print(json.dumps({"seconds": time.perf_counter() - start, "files": files, "bytes": size}))
+
+
+def _run_child(args: List[str]) -> Tuple[Dict, int]:
+    """Run this script with args in a fresh interpreter; returns its JSON output and peak RSS in KiB.
+
+    The peak RSS reported for a child never drops below the parent's at the
+    time it was started, so the parent does no heavy lifting itself.
+    """
+    proc = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), *args], stdout=subprocess.PIPE)
+    out = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit(f"Benchmark step failed: {' '.join(args)}")
+    return json.loads(out), usage.ru_maxrss
+
+
+def run_case(name: str, corpus: Path, work: Path) -> Dict:
+    """Run a case in a fresh interpreter; returns its throughput and peak RSS."""
+    measured, peak = _run_child(["--run-case", name, "--corpus", str(corpus), "--work", str(work)])
+    seconds = measured["seconds"]
+    return {
+        "seconds": round(seconds, 4),
+        "files": measured["files"],
+        "input_bytes": measured["bytes"],
+        "mb_per_s": round(measured["bytes"] / 1e6 / seconds, 2) if seconds else None,
+        "files_per_s": round(measured["files"] / seconds, 2) if seconds else None,
+        "peak_rss_mib": round(peak / 1024, 1),
+    }
+
+
+def compare(old: Dict, new: Dict) -> None:
+    """Print each case's change against an earlier results file."""
+    print(f"\n{'case':<18} {'MB/s before':>12} {'MB/s now':>10} {'change':>8} {'RSS before':>11} {'RSS now':>8}")
+    for name, now in new["cases"].items():
+        before = old.get("cases", {}).get(name)
+        if not before or not before.get("mb_per_s") or not now.get("mb_per_s"):
+            continue
+        change = 100 * (now["mb_per_s"] / before["mb_per_s"] - 1)
+        print(f"{name:<18} {before['mb_per_s']:>12.1f} {now['mb_per_s']:>10.1f} {change:>+7.1f}% "
+              f"{before['peak_rss_mib']:>11.1f} {now['peak_rss_mib']:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark convert.py, header emission and split_samples.py "
+                                                 "end to end on a synthetic WAV corpus")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small",
+                        help="Corpus shape: " + ", ".join(f"{k} = {n} files of {lo:g}-{hi:g} s"
+                                                           for k, (n, lo, hi) in PRESETS.items())
+                             + " (default: small)")
+    parser.add_argument("--files", type=int, help="Override the preset's file count")
+    parser.add_argument("--min-seconds", type=float, help="Override the preset's shortest file")
+    parser.add_argument("--max-seconds", type=float, help="Override the preset's longest file")
+    parser.add_argument("--channels", default="1,2", help="Channel counts to mix (default: 1,2)")
+    parser.add_argument("--signals", default=",".join(SIGNALS),
+                        help=f"Content to cycle through (default: {','.join(SIGNALS)})")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Cases to run (default: {','.join(CASES)})")
+    parser.add_argument("--corpus", type=Path,
+                        help="Keep the corpus here and reuse it when the parameters match (default: a temp dir)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_results.json"),
+                        help="Results file (default: bench_results.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--build-corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--work", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        _run_case_here(args.run_case, args.corpus, args.work)
+        return
+    if args.build_corpus:
+        p = json.loads(args.build_corpus)
+        print(json.dumps(build_corpus(args.corpus, p["files"], p["min_seconds"], p["max_seconds"],
+                                      p["channels"], p["signals"])))
+        return
+
+    files, lo, hi = PRESETS[args.preset]
+    files = args.files if args.files is not None else files
+    lo = args.min_seconds if args.min_seconds is not None else lo
+    hi = args.max_seconds if args.max_seconds is not None else hi
+    channels = [int(c) for c in args.channels.split(",")]
+    signals = [s.strip() for s in args.signals.split(",")]
+    cases = [c.strip() for c in args.cases.split(",")]
+    if files < 1 or not 0 < lo <= hi:
+        parser.error("need at least one file and 0 < --min-seconds <= --max-seconds")
+    for s in signals:
+        if s not in SIGNALS:
+            parser.error(f"unknown signal {s!r}; choose from {', '.join(SIGNALS)}")
+    for c in cases:
+        if c not in CASES:
+            parser.error(f"unknown case {c!r}; choose from {', '.join(CASES)}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_tools_") as tmp:
+        corpus = args.corpus or Path(tmp) / "corpus"
+        start = time.perf_counter()
+        params = {"files": files, "min_seconds": lo, "max_seconds": hi, "channels": channels, "signals": signals}
+        info, _ = _run_child(["--build-corpus", json.dumps(params), "--corpus", str(corpus)])
+        print(f"Corpus: {files} files, {info['audio_seconds']:.1f} s of audio, {info['wav_bytes'] / 1e6:.1f} MB "
+              f"({time.perf_counter() - start:.1f} s to prepare)")
+
+        results = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": wavin.np is not None,
+            "cpus": os.cpu_count(),
+            "preset": args.preset,
+            "corpus": info,
+            "cases": {},
+        }
+        print(f"{'case':<18} {'seconds':>9} {'MB/s':>8} {'files/s':>9} {'peak RSS MiB':>13}")
+        for name in cases:
+            work = Path(tmp) / "work" / name
+            work.mkdir(parents=True)
+            r = run_case(name, corpus, work)
+            results["cases"][name] = r
+            print(f"{name:<18} {r['seconds']:>9.2f} {r['mb_per_s']:>8.1f} {r['files_per_s']:>9.1f} "
+                  f"{r['peak_rss_mib']:>13.1f}")
+
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# buildcache.py — content‑hash manifest for skipping unchanged conversions
+# MIT‑like license, standard library only
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = ".wavtools-manifest.json"
+MANIFEST_VERSION = 3  # entries keyed by output, with its sample count; 1 keyed them by input
+HASH_CHUNK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA‑256 hex digest of a file, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_key(path: Path) -> Optional[list]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class BuildCache:
+    """Per‑directory manifest of output → input hash + options + output hash.
+
+    Entries are keyed by output, so one input converted twice into the
+    same directory with different options keeps both entries.
+
+    A hit needs the input's content hash and the options to match the
+    recorded entry, and the output file to still be the one we wrote.  The
+    input hash is only recomputed when its size or mtime changed, so a
+    fully cached run costs one stat per file.
+    """
+
+    def __init__(self, directory: Path):
+        self.path = directory / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("entries", {})
+
+    @staticmethod
+    def _key(out_path: Path) -> str:
+        return str(out_path.resolve())
+
+    def _input_digest(self, in_path: Path, entry: Optional[Dict[str, Any]]) -> str:
+        if entry and entry.get("input_stat") == _stat_key(in_path):
+            return entry["input_sha256"]
+        return file_digest(in_path)
+
+    def is_fresh(self, in_path: Path, options: Dict[str, Any], out_path: Path) -> bool:
+        """Return True if out_path is up to date for in_path converted with options."""
+        entry = self.entries.get(self._key(out_path))
+        if not entry or entry.get("options") != options or entry.get("input") != str(in_path.resolve()):
+            return False
+        out_stat = _stat_key(out_path)
+        if out_stat is None:
+            return False
+        if entry.get("output_stat") != out_stat:
+            if file_digest(out_path) != entry["output_sha256"]:
+                return False
+            entry["output_stat"] = out_stat
+            self.dirty = True
+        if self._input_digest(in_path, entry) != entry["input_sha256"]:
+            return False
+        in_stat = _stat_key(in_path)
+        if entry["input_stat"] != in_stat:
+            # Same content, new mtime (e.g. a fresh checkout): skip the rehash next time
+            entry["input_stat"] = in_stat
+            self.dirty = True
+        return True
+
+    def record(self, in_path: Path, options: Dict[str, Any], out_path: Path, frames: int) -> None:
+        """Remember that out_path, holding frames samples, was just generated from in_path with options."""
+        self.entries[self._key(out_path)] = {
+            "frames": frames,
+            "input": str(in_path.resolve()),
+            "input_sha256": file_digest(in_path),
+            "input_stat": _stat_key(in_path),
+            "options": options,
+            "output_sha256": file_digest(out_path),
+            "output_stat": _stat_key(out_path),
+        }
+        self.dirty = True
+
+    def frames(self, out_path: Path) -> int:
+        """Sample count recorded for out_path, which must have an entry.
+
+        Packed formats pad their last group or block, so the count cannot
+        be recovered from the output's size.
+        """
+        return self.entries[self._key(out_path)]["frames"]
+
+    def save(self) -> None:
+        """Write the manifest back atomically if anything changed."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "entries": self.entries}, indent=1, sort_keys=True))
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -1,73 +1,619 @@
 #!/usr/bin/env python3
-# wav_table_gen_cli.py — WAV → comma‑separated 0x?? text (CLI version)
-# MIT‑like license, standard library only
+# convert.py — WAV → sample text, firmware headers or raw .incbin banks (CLI and library)
+# MIT‑like license, standard library only (wavin, resample and trim use NumPy when installed)
+#
+# The pipeline itself lives in sibling modules: wavin reads any WAV as
+# mono int16, resample/trim/pcmformat/adpcm shape the storage, hexfmt and
+# headers render it, and buildcache skips inputs that have not changed.
 
+import math
+import os
 import sys
 import wave
 import argparse
+import cProfile
+import csv
+import dataclasses
+import io
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import IO, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import adpcm
+import headers
+import hexfmt
+import instrument
+import pcmformat
+import resample
+import trim
+import watch
+import wavin
+from buildcache import BuildCache
+from errors import BatchError, ConversionError
 
 
 MAX_FILES = 18
 MAX_SECONDS = 20
+STREAM_CHUNK_FRAMES = 65536  # frames per read in --stream mode (128 KiB of PCM)
+QUEUE_POLL_SECONDS = 0.1  # --pipeline stages recheck for a failed stage this often while blocked
 
 
-def process_file(in_path: Path, output_dir: Path = None, verbose: bool = False, max_seconds: int = MAX_SECONDS) -> None:
-    """Process a single WAV file and convert it to hex format."""
-    if not in_path.exists():
-        print(f"Error: File not found: {in_path}", file=sys.stderr)
-        sys.exit(1)
+@dataclass(frozen=True)
+class ConvertOptions:
+    """Settings shared by every file in one conversion run."""
+    max_seconds: int = MAX_SECONDS
+    fmt: str = "hex"
+    emit: str = "txt"  # "txt" = bare hex text, "headers" = sampleNN.h, "incbin" = raw sampleNN.bin
+    rate: Optional[float] = None  # resample to this rate (Hz); None keeps the WAV's rate
+    storage: str = "pcm16"  # flash storage format, see pcmformat.FORMAT_IDS
+    dither: bool = True  # TPDF dither when input conversion or storage drops bits
+    trim_silence: bool = False  # cut leading/trailing silence, see trim.py
+    trim_db: float = trim.THRESHOLD_DBFS
+    stream: bool = False
+    chunk_frames: int = STREAM_CHUNK_FRAMES
+    stats: bool = False  # time each stage and trace memory, see instrument.py
+
+    def cache_key(self) -> Dict[str, Any]:
+        """The options that change the generated output, as recorded in the manifest."""
+        return {"max_seconds": self.max_seconds, "format": self.fmt, "emit": self.emit, "rate": self.rate,
+                "storage": self.storage, "dither": self.dither,
+                "trim": self.trim_db if self.trim_silence else None}
+
+
+@dataclass
+class ConversionResult:
+    """Summary of one converted file, as reported on the console."""
+    in_path: Path
+    out_path: Path
+    rate: float
+    frames: int
+    byte_count: int
+    char_count: Optional[int]  # None for raw binary output
+    trim_points: Optional[trim.TrimPoints] = None
+    bytes_saved: int = 0  # by trimming, in the output format
+    stats: Optional[Dict[str, Any]] = None  # instrument.file_stats() when options.stats
 
+
+def output_path_for(in_path: Path, output_dir: Optional[Path] = None, sample_name: Optional[str] = None,
+                    emit: str = "txt") -> Path:
+    """Return the path in_path converts to: NAME.txt, sampleNN.h or sampleNN.bin."""
+    if sample_name:
+        suffix = headers.RAW_SUFFIX if emit == "incbin" else ".h"
+        return (output_dir or in_path.parent) / f"{sample_name}{suffix}"
     if output_dir:
-        out_path = output_dir / in_path.with_suffix(".txt").name
-    else:
-        out_path = in_path.with_suffix(".txt")
+        return output_dir / in_path.with_suffix(".txt").name
+    return in_path.with_suffix(".txt")
+
+
+def _read_chunks(w: wavin.WavReader, frames: int, chunk_frames: int) -> Iterator[bytes]:
+    """Yield up to frames frames of PCM from w, chunk_frames at a time."""
+    remaining = frames
+    while remaining > 0:
+        chunk = w.readview(min(chunk_frames, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk) // w.getsampwidth()
+        yield chunk
+
+
+def _write_output(chunks: Iterable[bytes], out: IO, options: ConvertOptions,
+                  sample_name: Optional[str], frames_of: Callable[[int], int]) -> Tuple[int, Optional[int]]:
+    """Format PCM chunks into the open stream out.  Returns (bytes, chars).
 
+    frames_of maps the bytes written to the samples they hold, for the
+    header's *_LEN once the chunks are exhausted.
+
+    In stream mode the chunks are options.chunk_frames long and only one
+    chunk of PCM and its text are alive at once, so peak memory does not
+    grow with file length.  In header mode the data is wrapped in the
+    sampleNN.h template on the way out; in incbin mode the raw PCM is
+    written as is and out must be binary.
+    """
+    if options.emit == "incbin":
+        byte_count = 0
+        for chunk in chunks:
+            out.write(chunk)
+            byte_count += len(chunk)
+        return byte_count, None
+
+    dialect = hexfmt.DIALECTS[options.fmt]
+    if sample_name:
+        out.write(headers.sample_header_prefix(sample_name, dialect.ctype))
+    formatter = hexfmt.StreamFormatter(out, dialect)
+    for chunk in chunks:
+        formatter.write(chunk)
+    formatter.close()
+    if sample_name:
+        out.write(headers.sample_header_suffix(sample_name, options.storage, frames_of(formatter.byte_count)))
+    return formatter.byte_count, formatter.char_count
+
+
+@contextmanager
+def _conversion_errors(in_path: Path) -> Iterator[None]:
+    """Turn anything raised while converting in_path into a ConversionError."""
     try:
-        with wave.open(str(in_path), "rb") as w:
-            if w.getnchannels() != 1:
-                print("Error: Stereo is not supported. Use mono.", file=sys.stderr)
-                sys.exit(1)
-            if w.getsampwidth() != 2:
-                print("Error: Only 16‑bit PCM is supported.", file=sys.stderr)
-                sys.exit(1)
-            if w.getcomptype() != "NONE":
-                print("Error: Compressed WAV is not supported.", file=sys.stderr)
-                sys.exit(1)
-
-            rate = w.getframerate()
-            frames = min(rate * max_seconds, w.getnframes())  # up to max_seconds
-            raw_bytes = w.readframes(frames)
-
-        # Build comma‑separated 0x?? string
-        hex_line = ",".join(f"0x{b:02X}" for b in raw_bytes)
-        
-        # Ensure output directory exists
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(hex_line)
-
-        if verbose:
-            print(f"Processed: {in_path.name}")
-            print(f"  Sample rate: {rate} Hz")
-            print(f"  Duration: {frames / rate:.2f} seconds")
-            print(f"  Bytes: {len(raw_bytes)}")
-        
-        print(f"Wrote {len(raw_bytes)} bytes ({len(hex_line)} characters) to {out_path}")
-
-    except wave.Error as e:
-        print(f"Error processing {in_path}: {e}", file=sys.stderr)
-        sys.exit(1)
+        yield
+    except ConversionError:
+        raise
+    except (wave.Error, EOFError) as e:
+        raise ConversionError(f"Cannot read {in_path}: {str(e) or 'file is truncated'}") from e
     except Exception as e:
-        print(f"Unexpected error processing {in_path}: {e}", file=sys.stderr)
-        sys.exit(1)
+        raise ConversionError(f"Unexpected failure processing {in_path}: {e}") from e
+
+
+def _stage(clock: Optional[instrument.StageClock], name: str) -> ContextManager:
+    return clock.stage(name) if clock else nullcontext()
+
+
+def _timed(clock: Optional[instrument.StageClock], name: str, chunks: Iterable[bytes]) -> Iterable[bytes]:
+    return clock.wrap(name, chunks) if clock else chunks
+
+
+def _convert(w: wavin.WavReader, in_path: Path, out: IO, out_path: Path, options: ConvertOptions,
+             sample_name: Optional[str], clock: Optional[instrument.StageClock] = None) -> ConversionResult:
+    """Run the conversion stages from an open reader into an open output stream.
+
+    With a clock, the time spent in each stage is charged to it.
+    """
+    rate = w.getframerate()
+    frames = min(rate * options.max_seconds, w.getnframes())  # up to max_seconds
+    chunk_frames = options.chunk_frames if options.stream else frames
+    chunks = _timed(clock, "read", _read_chunks(w, frames, chunk_frames))
+    src_rate = rate
+
+    # Cut silence: one analysis pass, then re-read just the kept span
+    points = None
+    if options.trim_silence:
+        with _stage(clock, "trim"):
+            points = trim.analyze(chunks, rate, options.trim_db)
+        w.setpos(points.start)
+        chunks = _timed(clock, "read", _read_chunks(w, points.kept, chunk_frames))
+        chunks = _timed(clock, "trim", trim.fade_chunks(chunks, points, rate))
+
+    # Band-limit and resample to the playback rate if one was asked for
+    if options.rate and options.rate != rate:
+        chunks = _timed(clock, "resample", resample.resample_pcm_chunks(chunks, rate, options.rate))
+        rate = options.rate
+
+    # Requantise for the flash storage format; the encoder counts the samples,
+    # as packed formats pad the last group or block
+    encoder = None
+    if options.storage != "pcm16":
+        encoder = pcmformat.PcmEncoder(options.storage, options.dither)
+        chunks = _timed(clock, "encode", pcmformat.encode_chunks(chunks, options.storage, encoder=encoder))
+
+    def frames_of(byte_count: int) -> int:
+        return encoder.frames if encoder else pcmformat.frames_in(byte_count, "pcm16")
+
+    if clock:
+        out = instrument.TimedWriter(out, clock)
+    with _stage(clock, "format"):
+        byte_count, char_count = _write_output(chunks, out, options, sample_name, frames_of)
+
+    frames = frames_of(byte_count)
+    result = ConversionResult(in_path, out_path, rate, frames, byte_count, char_count, points)
+    if points:
+        untrimmed = math.ceil(points.total * rate / src_rate)
+        result.bytes_saved = pcmformat.bytes_per_frames(untrimmed, options.storage) - byte_count
+    return result
+
+
+def convert_file(in_path: Path, output_dir: Path = None, options: Optional[ConvertOptions] = None,
+                 sample_name: Optional[str] = None) -> ConversionResult:
+    """Convert a single WAV file to hex format, raising ConversionError on failure.
+
+    With sample_name the output is a firmware header declaring that array.
+    """
+    options = options or ConvertOptions()
+    if not in_path.exists():
+        raise ConversionError(f"File not found: {in_path}")
+
+    out_path = output_path_for(in_path, output_dir, sample_name, options.emit)
+    clock = instrument.StageClock() if options.stats else None
+    if clock:
+        instrument.start_memory_trace()
+    started = time.perf_counter()
+
+    with _conversion_errors(in_path):
+        # Any channel count, integer or float: read back as mono int16
+        with _stage(clock, "open"):
+            w = wavin.open_wav(in_path, options.dither)
+        with w:
+            # Ensure output directory exists
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with out_path.open("wb" if options.emit == "incbin" else "w") as out:
+                result = _convert(w, in_path, out, out_path, options, sample_name, clock)
+
+    if clock:
+        result.stats = instrument.file_stats(in_path, out_path, clock, time.perf_counter() - started,
+                                             in_path.stat().st_size, out_path.stat().st_size,
+                                             instrument.memory_peak())
+    return result
+
+
+def convert_data(data: bytes, in_path: Path, output_dir: Path = None, options: Optional[ConvertOptions] = None,
+                 sample_name: Optional[str] = None) -> Tuple[ConversionResult, Union[bytes, str]]:
+    """Convert a WAV file already read into memory; returns the result and the output, unwritten.
+
+    The output is bytes for incbin and text otherwise; in_path names the
+    file in messages and the result.  With options.stats the figures cover
+    conversion only: reading and writing are the caller's.
+    """
+    options = options or ConvertOptions()
+    out_path = output_path_for(in_path, output_dir, sample_name, options.emit)
+    out = io.BytesIO() if options.emit == "incbin" else io.StringIO()
+    clock = instrument.StageClock() if options.stats else None
+    if clock:
+        instrument.start_memory_trace()
+    started = time.perf_counter()
+
+    with _conversion_errors(in_path):
+        with _stage(clock, "open"):
+            w = wavin.open_wav(in_path, options.dither, data)
+        with w:
+            result = _convert(w, in_path, out, out_path, options, sample_name, clock)
+
+    payload = out.getvalue()
+    if clock:
+        result.stats = instrument.file_stats(in_path, out_path, clock, time.perf_counter() - started,
+                                             len(data), len(payload), instrument.memory_peak())
+    return result, payload
+
+
+def report(result: ConversionResult, verbose: bool = False) -> None:
+    """Print the console summary for a converted file."""
+    if verbose:
+        print(f"Processed: {result.in_path.name}")
+        print(f"  Sample rate: {result.rate:g} Hz")
+        print(f"  Duration: {result.frames / result.rate:.2f} seconds")
+        print(f"  Bytes: {result.byte_count}")
+    if result.trim_points:
+        t = result.trim_points
+        print(f"  Trimmed {t.removed} of {t.total} frames (kept {t.start}..{t.end}, noise floor "
+              f"{t.noise_floor_dbfs:.1f} dBFS, gate {t.threshold_dbfs:.1f} dBFS), saved {result.bytes_saved} bytes")
+
+    if result.char_count is None:
+        print(f"Wrote {result.byte_count} bytes to {result.out_path}")
+    else:
+        print(f"Wrote {result.byte_count} bytes ({result.char_count} characters) to {result.out_path}")
+
+
+# Called once per converted file with (input path, result, None) or (input path, None, error message)
+OnDone = Callable[[Path, Optional[ConversionResult], Optional[str]], None]
+
+
+def print_outcome(verbose: bool = False) -> OnDone:
+    """An OnDone that reports each file on the console, errors to stderr."""
+    def on_done(in_path: Path, result: Optional[ConversionResult], error: Optional[str]) -> None:
+        if error is not None:
+            print(f"Error: {error}", file=sys.stderr)
+        else:
+            report(result, verbose)
+    return on_done
+
+
+def process_file(in_path: Path, output_dir: Path = None, verbose: bool = False,
+                 options: Optional[ConvertOptions] = None, sample_name: Optional[str] = None) -> ConversionResult:
+    """Convert a single WAV file and print its summary; raises ConversionError on failure."""
+    result = convert_file(in_path, output_dir, options, sample_name)
+    report(result, verbose)
+    return result
+
+
+def _convert_job(in_path: Path, output_dir: Optional[Path], options: ConvertOptions,
+                 sample_name: Optional[str]) -> Tuple[Optional[ConversionResult], Optional[str]]:
+    """Worker entry point: never raises, so one bad file cannot take the pool down."""
+    try:
+        return convert_file(in_path, output_dir, options, sample_name), None
+    except ConversionError as e:
+        return None, str(e)
+
+
+def process_files_parallel(files: List[Path], output_dir: Path = None, verbose: bool = False,
+                           options: Optional[ConvertOptions] = None, jobs: int = 0,
+                           sample_names: Optional[List[Optional[str]]] = None,
+                           on_done: Optional[OnDone] = None) -> List[Optional[ConversionResult]]:
+    """Convert files over a process pool and hand each outcome to on_done in input order.
+
+    on_done defaults to printing.  Returns one entry per input file, None
+    where the conversion failed.
+    """
+    options = options or ConvertOptions()
+    sample_names = sample_names or [None] * len(files)
+    on_done = on_done or print_outcome(verbose)
+    workers = jobs or os.cpu_count() or 1
+    results: List[Optional[ConversionResult]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        futures = [pool.submit(_convert_job, f, output_dir, options, name) for f, name in zip(files, sample_names)]
+        # Collect in submission order so console output is deterministic
+        for file_path, future in zip(files, futures):
+            result, error = future.result()
+            on_done(file_path, result, error)
+            results.append(result)
+    return results
+
+
+@dataclass
+class PipelineStats:
+    """Busy time of each pipeline stage, for the utilisation report."""
+    wall: float = 0.0
+    read: float = 0.0
+    convert: float = 0.0  # summed over workers
+    write: float = 0.0
+    workers: int = 1
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    def summary(self) -> str:
+        def pct(busy: float, lanes: int = 1) -> str:
+            return f"{100 * busy / (self.wall * lanes):.0f}%" if self.wall else "-"
+        return (f"Pipeline utilisation over {self.wall:.2f} s: "
+                f"read {pct(self.read)} ({self.read:.2f} s, {self.bytes_read / 1e6:.1f} MB), "
+                f"convert {pct(self.convert, self.workers)} of {self.workers} worker(s) ({self.convert:.2f} s), "
+                f"write {pct(self.write)} ({self.write:.2f} s, {self.bytes_written / 1e6:.1f} MB)")
+
+
+def _convert_data_job(data: bytes, in_path: Path, output_dir: Optional[Path], options: ConvertOptions,
+                      sample_name: Optional[str]) -> Tuple[Optional[ConversionResult], Any, Optional[str], float]:
+    """Pipeline worker: convert in memory, never raises.  Returns (result, output, error, seconds)."""
+    start = time.perf_counter()
+    try:
+        result, payload = convert_data(data, in_path, output_dir, options, sample_name)
+        return result, payload, None, time.perf_counter() - start
+    except ConversionError as e:
+        return None, None, str(e), time.perf_counter() - start
+
+
+def process_files_pipelined(files: List[Path], output_dir: Path = None, verbose: bool = False,
+                            options: Optional[ConvertOptions] = None, jobs: int = 0,
+                            sample_names: Optional[List[Optional[str]]] = None,
+                            depth: int = 0,
+                            on_done: Optional[OnDone] = None) -> Tuple[List[Optional[ConversionResult]], PipelineStats]:
+    """Convert files with reading, converting and writing overlapped.
+
+    A reader thread prefetches whole files into a bounded queue, worker
+    processes convert them in memory and a writer thread writes the outputs
+    in input order, so disk or network latency hides behind conversion.  At
+    most depth files and depth outputs are held at once, which bounds memory.  Outcomes
+    go to on_done (default: printed) in input order.  Returns one entry per
+    input file (None where it failed) and the stage timings.
+
+    Anything else a stage raises (on_done itself, a dead worker process's
+    BrokenProcessPool) stops the pipeline and is re-raised here once both
+    threads have finished.
+    """
+    options = options or ConvertOptions()
+    sample_names = sample_names or [None] * len(files)
+    on_done = on_done or print_outcome(verbose)
+    workers = min(jobs or os.cpu_count() or 1, len(files))
+    depth = depth or 2 * workers
+    stats = PipelineStats(workers=workers)
+    done = object()
+    read_q: "queue.Queue" = queue.Queue(maxsize=depth)
+    write_q: "queue.Queue" = queue.Queue(maxsize=depth)
+    results: List[Optional[ConversionResult]] = []
+    # Anything a stage raises lands here and stops the others, which would
+    # otherwise block for ever on a queue nobody serves; the caller re-raises it
+    failures: List[BaseException] = []
+    stop = threading.Event()
+
+    def put(q: "queue.Queue", item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=QUEUE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q: "queue.Queue") -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        return done
+
+    def fail(e: BaseException) -> None:
+        failures.append(e)
+        stop.set()
+
+    def reader() -> None:
+        try:
+            for in_path, name in zip(files, sample_names):
+                start = time.perf_counter()
+                try:
+                    data, error = in_path.read_bytes(), None
+                    stats.bytes_read += len(data)
+                except OSError as e:
+                    data, error = None, f"Cannot read {in_path}: {e.strerror or e}"
+                stats.read += time.perf_counter() - start
+                if not put(read_q, (in_path, name, data, error)):
+                    return
+            put(read_q, done)
+        except BaseException as e:
+            fail(e)
+
+    def writer() -> None:
+        try:
+            while True:
+                item = get(write_q)
+                if item is done:
+                    return
+                in_path, future, error = item
+                result = payload = None
+                if future is not None:
+                    result, payload, error, busy = future.result()
+                    stats.convert += busy
+                if result is not None:
+                    start = time.perf_counter()
+                    try:
+                        result.out_path.parent.mkdir(parents=True, exist_ok=True)
+                        with result.out_path.open("wb" if options.emit == "incbin" else "w") as out:
+                            out.write(payload)
+                        stats.bytes_written += len(payload)
+                    except OSError as e:
+                        result, error = None, f"Cannot write {result.out_path}: {e.strerror or e}"
+                    stats.write += time.perf_counter() - start
+                on_done(in_path, result, error)
+                results.append(result)
+        except BaseException as e:
+            fail(e)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for t in threads:
+        t.start()
+    # One worker gains nothing from a process and would pay to pickle every output back
+    executor = ThreadPoolExecutor if workers == 1 else ProcessPoolExecutor
+    try:
+        with executor(max_workers=workers) as pool:
+            try:
+                while True:
+                    item = get(read_q)
+                    if item is done:
+                        break
+                    in_path, name, data, error = item
+                    future = None if error else pool.submit(_convert_data_job, data, in_path, output_dir, options,
+                                                            name)
+                    if not put(write_q, (in_path, future, error)):  # blocks while depth outputs are pending
+                        break
+                put(write_q, done)
+                threads[1].join()
+            except BaseException as e:
+                fail(e)
+            if stop.is_set():
+                pool.shutdown(cancel_futures=True)
+    finally:
+        stop.set()  # a no-op after a clean run: both threads have finished
+        for t in threads:
+            t.join()
+    if failures:
+        raise failures[0]
+    stats.wall = time.perf_counter() - started
+    return results, stats
+
+
+@dataclass
+class BatchResult:
+    """What convert_files did, for reporting."""
+    converted: List[ConversionResult]  # in input order
+    up_to_date: List[Path]  # outputs the build cache said were current
+    sample_names: List[Optional[str]]
+    master_file: Optional[Path] = None  # samples.h for headers and incbin banks
+    pipeline_stats: Optional[PipelineStats] = None
+
+
+def convert_files(files: List[Path], output_dir: Optional[Path] = None, options: Optional[ConvertOptions] = None,
+                  jobs: int = 1, pipeline: bool = False, depth: int = 0, force: bool = False,
+                  incbin_prefix: Optional[str] = None, on_done: Optional[OnDone] = None) -> BatchResult:
+    """Convert a batch as the command line does, without printing.
+
+    Outputs the build cache finds current are skipped unless force; the
+    rest convert sequentially (jobs 1), over a process pool or, with
+    pipeline, overlapped with reading and writing.  Header and incbin
+    batches are named sample01.. in input order and get their samples.h.
+    on_done sees every converted file's outcome as it completes.  If any
+    file fails the others are still converted and cached, then BatchError
+    is raised and no master file is written.
+    """
+    options = options or ConvertOptions()
+    if options.emit != "txt" and output_dir is None:
+        raise ConversionError(f"emit {options.emit!r} needs an output directory")
+    if options.emit != "incbin" and hexfmt.DIALECTS[options.fmt].width == 2 and options.storage != "pcm16":
+        raise ConversionError(f"format {options.fmt!r} writes int16 values and needs 16-bit PCM storage, "
+                              f"not {options.storage}")
+    if options.emit != "txt":
+        names = [headers.sample_name_for(i) for i in range(len(files))]
+    else:
+        names = [None] * len(files)
+
+    # Skip inputs whose content, options and output match the manifest
+    cache_key = options.cache_key()
+    caches: Dict[Path, BuildCache] = {}
+    pending = []
+    batch = BatchResult([], [], names)
+    for file_path, name in zip(files, names):
+        out_path = output_path_for(file_path, output_dir, name, options.emit)
+        if out_path.parent not in caches:
+            caches[out_path.parent] = BuildCache(out_path.parent)
+        if not force and caches[out_path.parent].is_fresh(file_path, cache_key, out_path):
+            batch.up_to_date.append(out_path)
+        else:
+            pending.append((file_path, name))
+
+    failures: List[Tuple[Path, str]] = []
+
+    def done(in_path: Path, result: Optional[ConversionResult], error: Optional[str]) -> None:
+        if error is not None:
+            failures.append((in_path, error))
+        else:
+            caches[result.out_path.parent].record(result.in_path, cache_key, result.out_path, result.frames)
+            batch.converted.append(result)
+        if on_done:
+            on_done(in_path, result, error)
+
+    paths, pending_names = [p for p, _ in pending], [n for _, n in pending]
+    try:
+        if pipeline and pending:
+            _, batch.pipeline_stats = process_files_pipelined(paths, output_dir, False, options, jobs,
+                                                              pending_names, depth, done)
+        elif jobs == 1 or len(pending) <= 1:
+            for file_path, name in pending:
+                done(file_path, *_convert_job(file_path, output_dir, options, name))
+        else:
+            process_files_parallel(paths, output_dir, False, options, jobs, pending_names, done)
+    finally:
+        for cache in caches.values():
+            cache.save()
+    if failures:
+        raise BatchError(f"{len(failures)} of {len(pending)} file(s) failed", failures)
+
+    if options.emit == "headers":
+        batch.master_file = headers.write_master_header(output_dir, names, hexfmt.DIALECTS[options.fmt].ctype)
+    elif options.emit == "incbin":
+        out_paths = [output_path_for(p, output_dir, n, options.emit) for p, n in zip(files, names)]
+        lengths = [caches[out.parent].frames(out) for out in out_paths]
+        batch.master_file = headers.write_incbin_bank(output_dir, names, incbin_prefix,
+                                                      [options.storage] * len(names), lengths)
+    return batch
+
+
+def write_trim_report(path: Path, results: List[ConversionResult]) -> None:
+    """Write one CSV row per trimmed file: where it was cut and the bytes saved."""
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "frames", "start", "end", "kept", "noise_floor_dbfs", "gate_dbfs",
+                         "bytes", "bytes_saved"])
+        for r in results:
+            t = r.trim_points
+            writer.writerow([r.in_path.name, t.total, t.start, t.end, t.kept, f"{t.noise_floor_dbfs:.1f}",
+                             f"{t.threshold_dbfs:.1f}", r.byte_count, r.bytes_saved])
+
+
+def parse_rate(value: str) -> float:
+    """argparse type for --rate: a rate in Hz, or "isr" for the firmware's PWM interrupt rate."""
+    if value.lower() == "isr":
+        return resample.ISR_RATE_HZ
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a rate in Hz or 'isr', got {value!r}")
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"rate must be positive, got {value!r}")
+    return rate
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Convert WAV files to comma-separated hex format for embedded systems",
         epilog=f"Supports up to {MAX_FILES} files and {MAX_SECONDS} seconds per file. "
-               "Only mono 16-bit PCM WAV files are supported."
+               "Reads 8/16/24/32-bit integer and 32/64-bit float WAV, any channel count (downmixed to mono)."
     )
     
     parser.add_argument(
@@ -80,7 +626,7 @@ def main() -> None:
     parser.add_argument(
         "-o", "--output-dir",
         type=Path,
-        help="Output directory for generated .txt files (default: same as input file)"
+        help="Output directory for generated .txt files or headers (default: same as input file)"
     )
     
     parser.add_argument(
@@ -96,6 +642,133 @@ def main() -> None:
         help=f"Maximum seconds to process per file (default: {MAX_SECONDS})"
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Convert files in parallel over N worker processes (0 = one per CPU, default: 1)"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap reading, converting (over --jobs workers) and writing through bounded queues, "
+             "and report each stage's utilisation; helps most when inputs are on slow or network storage"
+    )
+
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=0,
+        help="Files buffered between --pipeline stages (default: twice the worker count)"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read and write in fixed-size chunks so memory stays flat for long files and large --max-seconds"
+    )
+
+    parser.add_argument(
+        "-f", "--format",
+        choices=sorted(hexfmt.DIALECTS),
+        help="Text layout: hex = 0xNN,0xNN, c16 = 16 per line as in sample headers, dec = decimal, "
+             "str = string literal, which compiles much faster, i16 = int16_t values for 16-bit PCM, "
+             "which the firmware reads with one aligned load (default: hex for txt, c16 for headers)"
+    )
+
+    parser.add_argument(
+        "--emit",
+        choices=["txt", "headers", "incbin"],
+        default="txt",
+        help="txt = one .txt per WAV (default); headers = sampleNN.h per WAV, in argument order, "
+             "plus samples.h, written straight into --output-dir; incbin = raw sampleNN.bin per WAV "
+             "plus a samples.S that pulls them in with .incbin and an extern-only samples.h"
+    )
+
+    parser.add_argument(
+        "--incbin-prefix",
+        help="Directory of the .bin files as seen from an include path, used in samples.S "
+             "(default: the --output-dir name, e.g. samples/ for src/samples)"
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=parse_rate,
+        help="Resample with a band-limited polyphase filter to this rate in Hz, or 'isr' for the "
+             f"firmware's PWM interrupt rate (~{resample.ISR_RATE_HZ:.0f} Hz, 1 sample per wrap at 1.0x)"
+    )
+
+    parser.add_argument(
+        "--bits",
+        type=int,
+        choices=sorted(pcmformat.FORMAT_FOR_BITS),
+        default=16,
+        help="Flash storage word size: 16 = 16-bit PCM (default), 10 = packed 10-bit (the PWM's "
+             "resolution, 4 samples in 5 bytes), 8 = 8-bit PCM"
+    )
+
+    parser.add_argument(
+        "--codec",
+        choices=["pcm", "adpcm"],
+        default="pcm",
+        help="pcm = plain samples at --bits (default); adpcm = 4-bit IMA-ADPCM in "
+             f"{adpcm.BLOCK_SAMPLES}-sample seekable blocks, about 4:1 against 16-bit"
+    )
+
+    parser.add_argument(
+        "--no-dither",
+        action="store_true",
+        help="Round instead of applying TPDF dither when --bits is below 16 or the input is downmixed, "
+             "deeper than 16 bits or float"
+    )
+
+    parser.add_argument(
+        "--trim",
+        action="store_true",
+        help="Cut leading and trailing silence (below the noise floor or the gate) with a short fade at each cut"
+    )
+
+    parser.add_argument(
+        "--trim-db",
+        type=float,
+        default=trim.THRESHOLD_DBFS,
+        help=f"Silence gate for --trim in dBFS (default: {trim.THRESHOLD_DBFS:g}, the 10-bit PWM's LSB)"
+    )
+
+    parser.add_argument(
+        "--trim-report",
+        type=Path,
+        help="Write a CSV of trim points and bytes saved per converted file (implies --trim)"
+    )
+
+    parser.add_argument(
+        "--stats",
+        type=Path,
+        help="Write JSON with per-file and total time in open/read/trim/resample/encode/format/write, "
+             "bytes in and out, expansion ratio and tracemalloc peak (slows conversion while tracing)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Write a cProfile dump of the whole batch (view with python -m pstats FILE); "
+             "with --jobs other than 1 the worker processes are not profiled"
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reconvert every file even if the manifest says its output is up to date"
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After converting, keep polling the input files and reconvert just the ones that change "
+             "(debounced), rewriting samples.h only when its contents change; Ctrl+C stops"
+    )
+
     args = parser.parse_args()
 
     # Validate arguments
@@ -111,12 +784,105 @@ def main() -> None:
         if file_path.suffix.lower() != ".wav":
             print(f"Warning: {file_path} doesn't have .wav extension", file=sys.stderr)
 
-    # Process each file
-    for file_path in args.files:
-        process_file(file_path, args.output_dir, args.verbose, args.max_seconds)
+    if args.queue_depth < 0:
+        print(f"Error: --queue-depth must be 0 or greater, got {args.queue_depth}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.jobs < 0:
+        print(f"Error: --jobs must be 0 or greater, got {args.jobs}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.codec == "adpcm" and args.bits != 16:
+        print("Error: --bits applies to --codec pcm only; ADPCM always codes 16-bit input", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format and hexfmt.DIALECTS[args.format].width == 2 and (args.codec == "adpcm" or args.bits != 16):
+        print(f"Error: --format {args.format} writes int16 values; use it with 16-bit PCM", file=sys.stderr)
+        sys.exit(1)
+
+    if args.emit != "txt" and not args.output_dir:
+        print(f"Error: --emit {args.emit} needs --output-dir (e.g. src/samples)", file=sys.stderr)
+        sys.exit(1)
+
+    options = ConvertOptions(
+        max_seconds=args.max_seconds,
+        fmt=args.format or ("c16" if args.emit == "headers" else "hex"),
+        emit=args.emit,
+        stream=args.stream,
+        rate=args.rate,
+        storage="adpcm" if args.codec == "adpcm" else pcmformat.FORMAT_FOR_BITS[args.bits],
+        dither=not args.no_dither,
+        trim_silence=args.trim or args.trim_report is not None,
+        trim_db=args.trim_db,
+        stats=args.stats is not None,
+    )
+
+    def build(force: bool, profiler: Optional[cProfile.Profile] = None, list_up_to_date: bool = True) -> bool:
+        """One conversion run and its console report; returns False if any file failed."""
+        missing = [f for f in args.files if not f.exists()]
+        if missing:
+            print(f"Error: File not found: {', '.join(map(str, missing))}", file=sys.stderr)
+            return False
+        if profiler:
+            profiler.enable()
+
+        # Process each file
+        try:
+            batch = convert_files(args.files, args.output_dir, options, args.jobs, args.pipeline,
+                                  args.queue_depth, force, args.incbin_prefix, print_outcome(args.verbose))
+        except BatchError as e:
+            print(f"\n{e}", file=sys.stderr)
+            return False
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+                print(f"Wrote profile to {args.profile}")
+
+        for out_path in batch.up_to_date if list_up_to_date else []:
+            print(f"Up to date: {out_path}")
+        if batch.pipeline_stats:
+            print(batch.pipeline_stats.summary())
+
+        if args.emit == "headers":
+            print(f"Created master include file: {batch.master_file}")
+        elif args.emit == "incbin":
+            print(f"Created {headers.INCBIN_ASM} and master include file: {batch.master_file}")
+
+        converted = batch.converted
+        if options.trim_silence:
+            saved = sum(r.bytes_saved for r in converted)
+            print(f"Trimming saved {saved} bytes over {len(converted)} converted file(s)")
+            if args.trim_report:
+                write_trim_report(args.trim_report, converted)
+                print(f"Wrote trim report to {args.trim_report}")
 
-    print(f"\nSuccessfully processed {len(args.files)} file(s)")
+        if args.stats:
+            extra = {"pipeline": dataclasses.asdict(batch.pipeline_stats)} if batch.pipeline_stats else None
+            instrument.write_report(args.stats, [r.stats for r in converted], extra)
+            print(f"Wrote stats to {args.stats}")
 
+        skipped = len(batch.up_to_date)
+        print(f"\nSuccessfully processed {len(converted)} file(s)" + (f", {skipped} up to date" if skipped else ""))
+        return True
+
+    ok = build(args.force, cProfile.Profile() if args.profile else None)
+    if not args.watch:
+        if not ok:
+            sys.exit(1)
+        return
+
+    def rebuild(changed: Iterable[Path]) -> None:
+        start = time.perf_counter()
+        print(f"\nChanged: {', '.join(sorted(p.name for p in changed))}")
+        if build(force=False, list_up_to_date=False):
+            print(f"Rebuilt in {1000 * (time.perf_counter() - start):.0f} ms")
+
+    print(f"\nWatching {len(args.files)} file(s) for changes (Ctrl+C to stop)")
+    try:
+        watch.watch(lambda: watch.stat_files(args.files), rebuild)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
 
 if __name__ == "__main__":
     main()
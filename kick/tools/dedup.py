@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# dedup.py — content‑defined chunking and a shared chunk pool for .incbin sample banks
+# MIT‑like license, standard library only
+#
+# Every sample's storage bytes are cut into chunks where a gear rolling hash
+# hits a boundary pattern, so identical regions (silent tails, shared
+# attacks, duplicate files) cut into identical chunks wherever they sit in
+# a sample.  Each distinct chunk is stored once in samples_pool.bin, and a
+# chunk‑index table tells the firmware where each sample's chunks start.
+# Cuts only fall on whole storage units (a 16‑bit sample, a 5‑byte group of
+# four 10‑bit samples) so every chunk can be read with the plain format
+# reader.  ADPCM samples stay in one piece: the decoder carries state from
+# block to block and re-seeks when its base changes, so only whole
+# duplicate ADPCM samples are shared.
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import headers
+from pcmformat import frames_in
+
+POOL_FILE = "samples_pool.bin"
+
+# Storage unit in bytes per format; cuts land on multiples of it
+UNIT_BYTES = {"pcm16": 2, "pcm10": 5, "pcm8": 1}
+# Pool alignment per storage format, so the firmware can read a pcm16 chunk a halfword at a time
+ALIGN_BYTES = {"pcm16": 2}
+
+MIN_CHUNK = 256    # bytes; no cut before this
+AVG_BITS = 10      # a cut every 2**AVG_BITS bytes on average past MIN_CHUNK
+MAX_CHUNK = 4096   # bytes; forced cut
+TABLE_BYTES_PER_CHUNK = 8  # chunk_starts[] + chunk_offsets[] entries, uint32 each
+
+_GEAR = tuple(random.Random(0x6EA5).getrandbits(32) for _ in range(256))
+_MASK = ((1 << AVG_BITS) - 1) << (32 - AVG_BITS)  # test the high bits, which see the last 32 bytes
+
+
+@dataclass
+class DedupStats:
+    samples: int
+    chunks: int        # chunk references across all samples
+    unique_chunks: int
+    raw_bytes: int     # the samples stored one after another
+    pool_bytes: int
+    table_bytes: int
+
+    @property
+    def stored_bytes(self) -> int:
+        return self.pool_bytes + self.table_bytes
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+    def summary(self) -> str:
+        return (f"dedup {self.ratio:.2f}x: {self.raw_bytes} → {self.stored_bytes} bytes "
+                f"({self.unique_chunks} unique of {self.chunks} chunks, {self.table_bytes} bytes of index)")
+
+
+def cut_points(data: bytes, unit: int = 1) -> List[int]:
+    """Byte offsets where chunks end, the last being len(data).
+
+    Cuts depend only on the bytes since the previous cut, so equal runs
+    of data re-synchronise to the same cuts.
+    """
+    cuts = []
+    n = len(data)
+    start = 0
+    gear, mask = _GEAR, _MASK
+    while start < n:
+        end = min(n, start + MAX_CHUNK - MAX_CHUNK % unit)
+        pos = start + MIN_CHUNK - MIN_CHUNK % unit
+        if pos >= end:
+            cuts.append(end)
+            break
+        h = 0
+        cut = end
+        # The hash only remembers the last 32 bytes, so start it 32 before the first allowed cut
+        for i in range(max(start, pos - 32), end):
+            h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFF
+            # A cut after byte i must leave whole units on both sides
+            if i + 1 >= pos and not h & mask and (i + 1 - start) % unit == 0:
+                cut = i + 1
+                break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+@dataclass
+class ChunkedBank:
+    pool: bytearray
+    offsets: List[int]        # pool byte offset per chunk reference
+    starts: List[int]         # first sample of the chunk, within its own sample
+    first_chunk: List[int]    # per sample, index of its first reference; one extra at the end
+    lengths: List[int]        # samples per sample, as *_LEN
+    stats: DedupStats
+
+
+def build_pool(datas: Sequence[bytes], formats: Sequence[str],
+               lengths: Optional[Sequence[int]] = None) -> ChunkedBank:
+    """Chunk each sample's storage bytes and keep every distinct chunk once.
+
+    lengths are the samples' true sample counts (default: from the data
+    sizes, which count pcm10 and adpcm padding).
+    """
+    pool = bytearray()
+    seen: Dict[bytes, int] = {}
+    offsets: List[int] = []
+    starts: List[int] = []
+    first_chunk: List[int] = []
+    if lengths is None:
+        lengths = [frames_in(len(data), fmt) for data, fmt in zip(datas, formats)]
+    for data, fmt in zip(datas, formats):
+        first_chunk.append(len(offsets))
+        unit = UNIT_BYTES.get(fmt)
+        align = ALIGN_BYTES.get(fmt, 1)
+        cuts = (cut_points(data, unit) if unit else [len(data)]) or [0]  # an empty sample still gets a chunk
+        begin = 0
+        for end in cuts:
+            chunk = bytes(data[begin:end])
+            offset = seen.get(chunk)
+            if offset is None or offset % align:
+                # A copy stored by a byte-aligned format may sit at an odd offset
+                pool += bytes(-len(pool) % align)
+                offset = seen[chunk] = len(pool)
+                pool += chunk
+            offsets.append(offset)
+            starts.append(frames_in(begin, fmt))
+            begin = end
+    first_chunk.append(len(offsets))
+    stats = DedupStats(len(datas), len(offsets), len(seen), sum(len(d) for d in datas), len(pool),
+                       TABLE_BYTES_PER_CHUNK * len(offsets) + 4 * len(first_chunk))
+    return ChunkedBank(pool, offsets, starts, first_chunk, list(lengths), stats)
+
+
+def write_dedup_bank(output_dir: Path, sample_names: List[str], include_prefix: Optional[str] = None,
+                     formats: Optional[Sequence[str]] = None,
+                     lengths: Optional[Sequence[int]] = None) -> Tuple[Path, DedupStats]:
+    """Write samples_pool.bin, samples.S and samples.h from the sampleNN.bin files in output_dir.
+
+    formats and lengths are as for headers.write_incbin_bank().
+    The .bin files are left in place as the build cache's outputs.  Returns
+    the path of samples.h and the bank's deduplication figures.
+    """
+    if include_prefix is None:
+        include_prefix = f"{output_dir.name}/"
+    formats = formats or ["pcm16"] * len(sample_names)
+    datas = [(output_dir / f"{name}{headers.RAW_SUFFIX}").read_bytes() for name in sample_names]
+    bank = build_pool(datas, formats, lengths)
+    headers.write_if_changed(output_dir / POOL_FILE, bytes(bank.pool))
+    headers.write_if_changed(output_dir / headers.INCBIN_ASM, headers.chunked_asm(POOL_FILE, include_prefix))
+    master_file = output_dir / headers.MASTER_HEADER
+    headers.write_if_changed(master_file, headers.chunked_master_header(sample_names, bank.lengths, formats,
+                                                                        bank.offsets, bank.starts,
+                                                                        bank.first_chunk))
+    return master_file, bank.stats
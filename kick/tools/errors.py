@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# errors.py — exception types shared by the sample tools
+# MIT‑like license, standard library only
+
+from pathlib import Path
+from typing import List, Tuple
+
+
+class ToolError(Exception):
+    """Base class for every error the tools raise; catch this to handle them all."""
+
+
+class ConversionError(ToolError):
+    """Raised when a WAV file cannot be converted."""
+
+
+class BatchError(ConversionError):
+    """Raised when some files of a batch failed; the others were still converted.
+
+    failures holds (input path, message) for each file that failed.
+    """
+
+    def __init__(self, message: str, failures: List[Tuple[Path, str]]):
+        super().__init__(message)
+        self.failures = failures
+
+
+class ManifestError(ToolError):
+    """Raised when a bank manifest is malformed."""
+
+
+class SplitError(ToolError):
+    """Raised when a hand‑pasted sample.h cannot be split."""
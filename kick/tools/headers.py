@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# headers.py — C header templates for firmware sample banks
+# MIT‑like license, standard library only
+
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import adpcm
+from pcmformat import FORMAT_IDS, frames_in
+
+MASTER_HEADER = "samples.h"
+INCBIN_ASM = "samples.S"
+RAW_SUFFIX = ".bin"  # raw sampleNN.bin files pulled in by samples.S
+
+# Length of a sampleNN array in samples, per storage format; {size} is its byte size
+_LEN_EXPR = {
+    "pcm16": "{size} / 2",
+    "pcm10": "{size} / 5 * 4",
+    "pcm8": "{size}",
+    "adpcm": f"{{size}} / {adpcm.BLOCK_BYTES} * {adpcm.BLOCK_SAMPLES}",
+}
+
+
+def write_if_changed(path: Path, content: Union[str, bytes]) -> bool:
+    """Write content to path unless the file already holds exactly that; returns True if written.
+
+    An untouched file keeps its mtime, so the firmware build does not
+    recompile everything that includes it.  A changed file is replaced
+    atomically, so an interrupted run never leaves half a header behind.
+    """
+    data = content.encode() if isinstance(content, str) else content
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp = temp_path_for(path)
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def temp_path_for(path: Path) -> Path:
+    """Scratch file next to path, for writing it out before replace_if_changed."""
+    return path.with_name(path.name + ".tmp")
+
+
+def replace_if_changed(tmp: Path, path: Path) -> bool:
+    """Move the finished tmp over path unless path already holds the same bytes; returns True if replaced.
+
+    For outputs streamed to disk that are too big to hold in memory for
+    write_if_changed.  tmp is gone afterwards either way.
+    """
+    if _same_contents(tmp, path):
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def _same_contents(a: Path, b: Path, block: int = 1 << 16) -> bool:
+    """True if both files exist and hold the same bytes, compared a block at a time."""
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+        with a.open("rb") as fa, b.open("rb") as fb:
+            while True:
+                chunk = fa.read(block)
+                if chunk != fb.read(block):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
+
+def sample_name_for(index: int) -> str:
+    """Return the firmware array name for the zero‑based sample index."""
+    return f"sample{index + 1:02d}"
+
+
+def sample_header_prefix(sample_name: str, ctype: str = "uint8_t") -> str:
+    """Everything in sampleNN.h up to the first data value; ctype is the element type (hexfmt.Dialect.ctype)."""
+    return f"""#ifndef {sample_name.upper()}_H
+#define {sample_name.upper()}_H
+
+#include <pgmspace.h>
+
+// Sample data for {sample_name}
+const {ctype} {sample_name}[] PROGMEM = {{
+"""
+
+
+def sample_header_suffix(sample_name: str, fmt: str = "pcm16", frames: Optional[int] = None) -> str:
+    """Everything in sampleNN.h after the last data value.
+
+    frames, the sample count the tool wrote, becomes the length as a
+    literal number, as in the extern banks.  Without it the length is
+    derived from sizeof, which counts the terminating NUL of string-literal
+    data (hexfmt.STR) and the padding of a last pcm10 group or ADPCM block,
+    so the converters always pass it.
+    """
+    if frames is not None:
+        length = str(frames)
+    else:
+        length = "(" + _LEN_EXPR[fmt].format(size=f"sizeof({sample_name})") + ")"
+    return f"""
+}};
+
+// Sample length in samples, storage format ({fmt})
+#define {sample_name.upper()}_LEN ((uint32_t){length})
+#define {sample_name.upper()}_FMT SAMPLE_FMT_{fmt.upper()}
+
+#endif // {sample_name.upper()}_H
+"""
+
+
+def _format_ids() -> str:
+    """#defines for the storage format ids used by sample_formats[]."""
+    return "".join(f"#define SAMPLE_FMT_{fmt.upper()} {fid}\n" for fmt, fid in FORMAT_IDS.items())
+
+
+def _byte_pointers(sample_names: Sequence[str], ctype: str) -> Optional[List[str]]:
+    """samples[] entries for arrays of ctype: the firmware reads every format through a uint8_t pointer."""
+    if ctype == "uint8_t":
+        return None
+    return [f"(const uint8_t*){name}" for name in sample_names]
+
+
+def _lookup_tables(sample_names: Sequence[str], pointers: Optional[Sequence[str]] = None) -> str:
+    """The samples[] / sample_lengths[] tables and NUM_SAMPLES shared by every bank format.
+
+    pointers replaces the sample arrays as the samples[] entries.
+    """
+    tables = """
+// Array of sample pointers for easy access
+const uint8_t* const samples[] = {
+"""
+
+    for i, pointer in enumerate(pointers or sample_names):
+        tables += f"    {pointer}{',' if i < len(sample_names) - 1 else ''}\n"
+
+    tables += """};
+
+// Array of sample lengths
+const uint32_t sample_lengths[] = {
+"""
+
+    for i, sample_name in enumerate(sample_names):
+        tables += f"    {sample_name.upper()}_LEN{',' if i < len(sample_names) - 1 else ''}\n"
+
+    tables += """};
+
+// Array of sample storage formats (SAMPLE_FMT_*)
+const uint8_t sample_formats[] = {
+"""
+
+    for i, sample_name in enumerate(sample_names):
+        tables += f"    {sample_name.upper()}_FMT{',' if i < len(sample_names) - 1 else ''}\n"
+
+    tables += """};
+
+#define NUM_SAMPLES (sizeof(samples) / sizeof(samples[0]))
+
+#endif // SAMPLES_H
+"""
+    return tables
+
+
+def master_header(sample_names: Sequence[str], ctype: str = "uint8_t") -> str:
+    """Return samples.h, which includes every sample and builds the lookup tables.
+
+    ctype is the element type of the sampleNN arrays.
+    """
+    master_content = """#ifndef SAMPLES_H
+#define SAMPLES_H
+
+// Sample storage formats
+""" + _format_ids() + """
+// Include all individual sample headers
+"""
+
+    for sample_name in sample_names:
+        master_content += f'#include "{sample_name}.h"\n'
+
+    master_content += _lookup_tables(sample_names, _byte_pointers(sample_names, ctype))
+    return master_content
+
+
+def write_master_header(output_dir: Path, sample_names: List[str], ctype: str = "uint8_t") -> Path:
+    """Write samples.h into output_dir and return its path."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    master_file = output_dir / MASTER_HEADER
+    write_if_changed(master_file, master_header(sample_names, ctype))
+    return master_file
+
+
+def incbin_asm(sample_names: Sequence[str], include_prefix: str = "") -> str:
+    """Return samples.S, which pulls each raw sampleNN.bin into flash with .incbin.
+
+    The assembler resolves .incbin paths against the -I search path, so
+    include_prefix is the directory of the .bin files relative to an include
+    directory (PlatformIO puts src/ on it, hence "samples/" for src/samples).
+    """
+    asm = """/* Generated sample bank: raw PCM pulled in with .incbin */
+
+    .section .rodata.samples, "a"
+"""
+    for sample_name in sample_names:
+        asm += f"""
+    .balign 4
+    .global {sample_name}
+    .type {sample_name}, %object
+{sample_name}:
+    .incbin "{include_prefix}{sample_name}{RAW_SUFFIX}"
+    .size {sample_name}, . - {sample_name}
+"""
+    asm += """
+#if defined(__linux__) && defined(__ELF__)
+    .section .note.GNU-stack, "", %progbits
+#endif
+"""
+    return asm
+
+
+def _extern_master_header(sample_names: Sequence[str], lengths: Sequence[int], formats: Sequence[str],
+                          origin: str, ctype: str = "uint8_t") -> str:
+    """samples.h for arrays defined elsewhere: extern declarations, literal lengths and the usual tables.
+
+    origin is the comment saying where the data lives.
+    """
+    master_content = """#ifndef SAMPLES_H
+#define SAMPLES_H
+
+#include <stdint.h>
+
+// Sample storage formats
+""" + _format_ids() + f"""
+// {origin}
+extern "C" {{
+"""
+
+    for sample_name in sample_names:
+        master_content += f"extern const {ctype} {sample_name}[];\n"
+
+    master_content += "}\n\n"
+
+    for sample_name, length, fmt in zip(sample_names, lengths, formats):
+        master_content += f"#define {sample_name.upper()}_LEN ((uint32_t){length})\n"
+        master_content += f"#define {sample_name.upper()}_FMT SAMPLE_FMT_{fmt.upper()}\n"
+    master_content += _lookup_tables(sample_names, _byte_pointers(sample_names, ctype))
+    return master_content
+
+
+def incbin_master_header(sample_names: Sequence[str], lengths: Sequence[int], formats: Sequence[str]) -> str:
+    """Return samples.h for an .incbin bank: extern arrays plus the usual tables.
+
+    lengths are in samples, as the *_LEN macros of the header format.
+    """
+    return _extern_master_header(sample_names, lengths, formats,
+                                 "Sample data lives in samples.S (.incbin of the raw sampleNN.bin files)")
+
+
+def sample_source_prefix(sample_name: str, ctype: str = "uint8_t") -> str:
+    """Everything in sampleNN.cpp up to the first data value.
+
+    Each array gets a translation unit of its own, so the firmware build
+    compiles them in parallel and only recompiles the ones that changed.
+    """
+    return f"""// Sample data for {sample_name}, declared in {MASTER_HEADER}
+#include <pgmspace.h>
+#include <stdint.h>
+
+extern "C" const {ctype} {sample_name}[] PROGMEM = {{
+"""
+
+
+def sample_source_suffix() -> str:
+    """Everything in sampleNN.cpp after the last data value."""
+    return "\n};\n"
+
+
+def units_master_header(sample_names: Sequence[str], lengths: Sequence[int], formats: Sequence[str],
+                        ctype: str = "uint8_t") -> str:
+    """Return samples.h for a bank of sampleNN.cpp units: extern arrays plus the usual tables.
+
+    lengths are in samples, as for incbin_master_header; ctype is the
+    element type the units define.
+    """
+    return _extern_master_header(sample_names, lengths, formats,
+                                 "Sample data lives in one sampleNN.cpp per sample", ctype)
+
+
+def write_incbin_bank(output_dir: Path, sample_names: List[str], include_prefix: Optional[str] = None,
+                      formats: Optional[Sequence[str]] = None, lengths: Optional[Sequence[int]] = None) -> Path:
+    """Write samples.S and samples.h for the sampleNN.bin files already in output_dir.
+
+    formats gives each file's storage format (default: all pcm16) and
+    lengths their sample counts as the encoder reported them (default:
+    from the file sizes, which count pcm10 and adpcm padding).  Returns
+    the path of samples.h.
+    """
+    if include_prefix is None:
+        include_prefix = f"{output_dir.name}/"
+    formats = formats or ["pcm16"] * len(sample_names)
+    if lengths is None:
+        lengths = [frames_in((output_dir / f"{name}{RAW_SUFFIX}").stat().st_size, fmt)
+                   for name, fmt in zip(sample_names, formats)]
+    write_if_changed(output_dir / INCBIN_ASM, incbin_asm(sample_names, include_prefix))
+    master_file = output_dir / MASTER_HEADER
+    write_if_changed(master_file, incbin_master_header(sample_names, lengths, formats))
+    return master_file
+
+
+def _uint32_table(name: str, values: Sequence[int], per_line: int = 12) -> str:
+    """A const uint32_t array definition, per_line values to a line."""
+    lines = [", ".join(str(v) for v in values[i:i + per_line]) for i in range(0, len(values), per_line)]
+    return f"const uint32_t {name}[] = {{\n    " + ",\n    ".join(lines) + "\n};\n"
+
+
+def chunked_asm(pool_file: str, include_prefix: str = "") -> str:
+    """Return samples.S for a deduplicated bank: the whole chunk pool as one .incbin."""
+    return f"""/* Generated sample bank: deduplicated chunk pool pulled in with .incbin */
+
+    .section .rodata.samples, "a"
+
+    .balign 4
+    .global sample_pool
+    .type sample_pool, %object
+sample_pool:
+    .incbin "{include_prefix}{pool_file}"
+    .size sample_pool, . - sample_pool
+
+#if defined(__linux__) && defined(__ELF__)
+    .section .note.GNU-stack, "", %progbits
+#endif
+"""
+
+
+def chunked_master_header(sample_names: Sequence[str], lengths: Sequence[int], formats: Sequence[str],
+                          offsets: Sequence[int], starts: Sequence[int], first_chunk: Sequence[int]) -> str:
+    """Return samples.h for a deduplicated bank: the chunk index plus the usual tables.
+
+    samples[] points at each sample's first chunk, so code unaware of
+    SAMPLE_CHUNKS still finds the start of every sample.
+    """
+    master_content = """#ifndef SAMPLES_H
+#define SAMPLES_H
+
+#include <stdint.h>
+
+// Sample storage formats
+""" + _format_ids() + """
+// Deduplicated bank: every distinct chunk is stored once in sample_pool
+// (samples.S).  Sample i is chunks sample_chunk_first[i] up to
+// sample_chunk_first[i + 1]; chunk c holds the sample's data from sample
+// chunk_starts[c] on, at byte chunk_offsets[c] of the pool.  pcm16 chunks
+// start on even offsets, so they can be read a halfword at a time.
+#define SAMPLE_CHUNKS 1
+#define SAMPLE_CHUNKS_ALIGNED 1
+extern "C" const uint8_t sample_pool[];
+
+"""
+
+    for sample_name, length, fmt in zip(sample_names, lengths, formats):
+        master_content += f"#define {sample_name.upper()}_LEN ((uint32_t){length})\n"
+        master_content += f"#define {sample_name.upper()}_FMT SAMPLE_FMT_{fmt.upper()}\n"
+    master_content += "\n" + _uint32_table("sample_chunk_first", first_chunk)
+    master_content += _uint32_table("chunk_starts", starts)
+    master_content += _uint32_table("chunk_offsets", offsets)
+    pointers = [f"sample_pool + {offsets[first]}" for first in first_chunk[:-1]]
+    master_content += _lookup_tables(sample_names, pointers)
+    return master_content
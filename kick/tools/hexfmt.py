@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# hexfmt.py — table‑driven byte → text formatting shared by the WAV tools
+# MIT‑like license, standard library only
+
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Optional, TextIO, Tuple, Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Precomputed 256‑entry token tables: one string per possible byte value
+HEX_TOKENS: Tuple[str, ...] = tuple(f"0x{b:02X}" for b in range(256))
+DEC_TOKENS: Tuple[str, ...] = tuple(str(b) for b in range(256))
+# String‑literal escapes; every byte is escaped, so no escape can swallow the next character
+ESC_TOKENS: Tuple[str, ...] = tuple(f"\\x{b:02X}" for b in range(256))
+
+
+@dataclass(frozen=True)
+class Dialect:
+    """How a byte sequence is rendered as text.
+
+    Values are joined with ``sep``.  With ``per_line`` > 0 the output is
+    broken into lines of that many values, each starting with ``indent``;
+    the separator is kept at the end of every line but the last.  A
+    non‑empty ``quote`` wraps each line (or the whole run) in it, making
+    one C string literal per line that the compiler concatenates.
+
+    With ``width`` 2 each value is a little‑endian int16 (two input
+    bytes) written as signed decimal, and ``tokens`` is unused.  ``ctype``
+    is the C element type of an array initialised from the output.
+    """
+    name: str
+    tokens: Tuple[str, ...]
+    sep: str = ","
+    per_line: int = 0
+    indent: str = ""
+    quote: str = ""
+    width: int = 1
+    ctype: str = "uint8_t"
+    _pairs: Dict[str, Tuple[str, ...]] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def line_break(self) -> str:
+        return self.sep.rstrip() + self.quote + "\n" + self.indent + self.quote
+
+    @property
+    def line_start(self) -> str:
+        return (self.indent if self.per_line else "") + self.quote
+
+
+# Current convert.py / wav_table_gen_v1.py output: 0x00,0x0B,...
+HEX = Dialect("hex", HEX_TOKENS, ",")
+# split_samples.py header layout: 16 values per line, 4‑space indent
+C16 = Dialect("c16", HEX_TOKENS, ", ", per_line=16, indent="    ")
+# Plain decimal: 0,11,...
+DEC = Dialect("dec", DEC_TOKENS, ",")
+# String literal, 32 bytes per line: "\x00\x0B..."  The compiler takes a literal
+# as one token instead of an expression per byte, so large arrays parse far
+# faster; short lines keep each piece well inside any compiler's literal limit.
+# sizeof such an array counts the terminating NUL, so *_LEN is written as a
+# number (see headers.sample_header_suffix).
+STR = Dialect("str", ESC_TOKENS, "", per_line=32, indent="    ", quote='"')
+
+# Native int16 values, 16 per line: -34, 120, ...  Half as many initialisers
+# as c16, and the array is halfword aligned, so firmware can read a sample
+# with one load
+I16 = Dialect("i16", (), ", ", per_line=16, indent="    ", width=2, ctype="int16_t")
+
+DIALECTS: Dict[str, Dialect] = {d.name: d for d in (HEX, C16, DEC, STR, I16)}
+
+
+def _pair_table(dialect: Dialect) -> Tuple[str, ...]:
+    """Return a 65536‑entry table mapping a native uint16 to "tok(lo)<sep>tok(hi)".
+
+    Walking the input as 16‑bit words halves the number of Python‑level
+    lookups.  Built lazily and cached on the dialect.
+    """
+    table = dialect._pairs.get("table")
+    if table is None:
+        toks, sep = dialect.tokens, dialect.sep
+        if sys.byteorder == "little":
+            table = tuple(toks[v & 0xFF] + sep + toks[v >> 8] for v in range(65536))
+        else:
+            table = tuple(toks[v >> 8] + sep + toks[v & 0xFF] for v in range(65536))
+        dialect._pairs["table"] = table
+    return table
+
+
+def _int16_values(data: memoryview) -> array:
+    """data read as little‑endian int16 values.
+
+    An array rather than a cast memoryview: iterating a memoryview unpacks
+    each item through struct and is several times slower.
+    """
+    values = array("h")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _format_run(data: memoryview, dialect: Dialect) -> str:
+    """Format a run of bytes as one line of sep‑joined tokens."""
+    n = len(data)
+    if not n:
+        return ""
+    if dialect.width == 2:
+        return dialect.sep.join(map(str, _int16_values(data)))
+    if dialect.tokens is HEX_TOKENS or dialect.tokens is ESC_TOKENS:
+        # Bulk path: bytes.hex does the per‑byte work in C
+        prefix = dialect.tokens[0][:2]
+        return prefix + data.hex(" ").upper().replace(" ", dialect.sep + prefix)
+    if n < 4096:
+        return dialect.sep.join(map(dialect.tokens.__getitem__, data))
+    even = n & ~1
+    text = dialect.sep.join(map(_pair_table(dialect).__getitem__, data[:even].cast("H")))
+    if n != even:
+        text += dialect.sep + dialect.tokens[data[even]]
+    return text
+
+
+def _format_body(data: memoryview, dialect: Dialect) -> str:
+    """Format data, line‑broken if the dialect asks for it, without the first indent."""
+    step = dialect.per_line * dialect.width
+    if not step:
+        return _format_run(data, dialect)
+    if dialect.width == 2:
+        # One printf per whole line: cheaper than a str() per value plus a join
+        values = _int16_values(data)
+        per_line = dialect.per_line
+        whole = len(values) - len(values) % per_line
+        line = dialect.sep.join(["%d"] * per_line)
+        lines = [line % tuple(values[i:i + per_line]) for i in range(0, whole, per_line)]
+        if whole != len(values):
+            lines.append(dialect.sep.join(map(str, values[whole:])))
+        return dialect.line_break.join(lines)
+    return dialect.line_break.join(_format_run(data[i:i + step], dialect) for i in range(0, len(data), step))
+
+
+def format_bytes(data: BytesLike, dialect: Dialect = HEX) -> str:
+    """Render data as text in the given dialect."""
+    mv = memoryview(data).cast("B")
+    if not len(mv):
+        return ""
+    if len(mv) % dialect.width:
+        raise ValueError(f"{len(mv)} bytes is not a whole number of {dialect.name} values")
+    return dialect.line_start + _format_body(mv, dialect) + dialect.quote
+
+
+class StreamFormatter:
+    """Incrementally write formatted bytes to a text stream.
+
+    Chunks may be any size; separators and line breaks come out exactly as
+    format_bytes() would produce for the concatenated input.
+    """
+
+    def __init__(self, out: TextIO, dialect: Dialect = HEX):
+        self.out = out
+        self.dialect = dialect
+        self.byte_count = 0
+        self.char_count = 0
+        self._carry: Optional[bytes] = None  # partial line held back in per_line mode
+        self._closed = False
+
+    def _emit(self, text: str) -> None:
+        self.out.write(text)
+        self.char_count += len(text)
+
+    def _emit_run(self, run: memoryview) -> None:
+        d = self.dialect
+        if not self.byte_count:
+            lead = d.line_start
+        else:
+            lead = d.line_break if d.per_line else d.sep
+        self._emit(lead + _format_body(run, d))
+        self.byte_count += len(run)
+
+    def write(self, data: BytesLike) -> None:
+        mv = memoryview(data).cast("B")
+        if not len(mv):
+            return
+        step = (self.dialect.per_line or 1) * self.dialect.width
+        if step == 1:
+            self._emit_run(mv)
+            return
+        if self._carry:
+            mv = memoryview(self._carry + bytes(mv))
+            self._carry = None
+        whole = len(mv) - len(mv) % step
+        if whole:
+            self._emit_run(mv[:whole])
+        if whole != len(mv):
+            self._carry = bytes(mv[whole:])
+
+    def close(self) -> None:
+        """Flush any partial trailing line and close its quote.
+
+        Raises ValueError if the bytes written do not make whole values.
+        """
+        if self._carry and len(self._carry) % self.dialect.width:
+            raise ValueError(f"{self.byte_count + len(self._carry)} bytes is not a whole number of "
+                             f"{self.dialect.name} values")
+        if self._carry:
+            carry, self._carry = self._carry, None
+            self._emit_run(memoryview(carry))
+        if self.byte_count and self.dialect.quote and not self._closed:
+            self._emit(self.dialect.quote)
+        self._closed = True
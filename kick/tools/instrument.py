@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# instrument.py — per‑stage timing and memory figures for convert.py --stats
+# MIT‑like license, standard library only
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+# Reporting order; stages a run did not use are reported as 0
+STAGES = ("open", "read", "trim", "resample", "encode", "format", "write")
+
+T = TypeVar("T")
+
+
+class StageClock:
+    """Charge wall time to whichever stage is running, exclusive of the stages it pulls from.
+
+    Conversion stages are chained generators, so the time spent in one
+    next() call includes everything upstream.  The clock keeps a stack of
+    active stages and, on every switch, charges the elapsed time to the
+    top, so each stage's figure is its own work only.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self._stack: List[str] = []
+        self._last = time.perf_counter()
+
+    def _charge(self) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            self.seconds[self._stack[-1]] += now - self._last
+        self._last = now
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._charge()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._stack.pop()
+
+    def wrap(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from items, charging the time spent producing each one to name."""
+        it = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+
+class TimedWriter:
+    """File proxy that charges write() calls to the "write" stage."""
+
+    def __init__(self, out: IO, clock: StageClock):
+        self._out = out
+        self._clock = clock
+
+    def write(self, data: Any) -> int:
+        with self._clock.stage("write"):
+            return self._out.write(data)
+
+
+def start_memory_trace() -> None:
+    """Start tracemalloc if needed and reset its peak for the next file."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+
+def memory_peak() -> int:
+    return tracemalloc.get_traced_memory()[1]
+
+
+def file_stats(in_path: Path, out_path: Path, clock: StageClock, total: float, bytes_in: int,
+               bytes_out: int, peak: int) -> Dict[str, Any]:
+    """One file's figures as a JSON‑ready dict."""
+    return {
+        "file": str(in_path),
+        "output": str(out_path),
+        "seconds": {k: round(v, 6) for k, v in clock.seconds.items()},
+        "total_seconds": round(total, 6),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "expansion": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        "tracemalloc_peak_bytes": peak,
+    }
+
+
+def aggregate(files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals over a run, with each stage's share of the summed stage time."""
+    seconds = {k: sum(f["seconds"][k] for f in files) for k in STAGES}
+    staged = sum(seconds.values())
+    bytes_in = sum(f["bytes_in"] for f in files)
+    bytes_out = sum(f["bytes_out"] for f in files)
+    total = sum(f["total_seconds"] for f in files)
+    return {
+        "files": len(files),
+        "seconds": {k: round(v, 6) for k, v in seconds.items()},
+        "share": {k: round(v / staged, 4) if staged else 0.0 for k, v in seconds.items()},
+        "total_seconds": round(total, 6),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "expansion": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        "mb_in_per_s": round(bytes_in / 1e6 / total, 2) if total else None,
+        "tracemalloc_peak_bytes": max((f["tracemalloc_peak_bytes"] for f in files), default=0),
+    }
+
+
+def write_report(path: Path, files: List[Dict[str, Any]], extra: Optional[Dict[str, Any]] = None) -> None:
+    """Write {"files": [...], "total": {...}} plus any extra sections as JSON."""
+    report = {"files": files, "total": aggregate(files)}
+    report.update(extra or {})
+    path.write_text(json.dumps(report, indent=2) + "\n")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# kicktools.py — the sample tools as one importable API, for build scripts
+# MIT‑like license, standard library only (NumPy is used when installed)
+#
+# Build scripts can call the tools in‑process instead of starting an
+# interpreter per file or batch:
+#
+#   sys.path.insert(0, "kick/tools")
+#   import kicktools
+#
+#   pcm = kicktools.read_pcm("samples/BD.wav")            # Pcm: data, rate, info
+#   result, payload = kicktools.convert_data(wav_bytes, Path("BD.wav"),
+#                                            options=kicktools.ConvertOptions(emit="incbin"))
+#   batch = kicktools.convert_files(wavs, Path("src/samples"),
+#                                   kicktools.ConvertOptions(fmt="c16", emit="headers"), jobs=0)
+#   banks = kicktools.build_manifest(Path("banks.toml"))
+#   split = kicktools.extract_samples(Path("src/sample.h"), Path("src/samples"))
+#
+# Nothing here prints or exits; failures raise a subclass of ToolError
+# (ConversionError, BatchError, ManifestError, SplitError, WavError).  The
+# command-line scripts are thin wrappers that print these results.
+
+from bankbuild import BankResult, BankSpec, SampleSpec, build_bank, build_manifest, load_manifest, select_banks
+from convert import (BatchResult, ConversionResult, ConvertOptions, OnDone, convert_data, convert_file,
+                     convert_files, output_path_for, parse_rate)
+from dedup import DedupStats
+from errors import BatchError, ConversionError, ManifestError, SplitError, ToolError
+from split_samples import SampleArray, SplitResult, extract_samples, parse_samples, scan_samples
+from wavin import Pcm, WavError, WavInfo, open_wav, read_pcm
+
+__all__ = [
+    "BankResult", "BankSpec", "BatchError", "BatchResult", "ConversionError", "ConversionResult",
+    "ConvertOptions", "DedupStats", "ManifestError", "OnDone", "Pcm", "SampleArray", "SampleSpec",
+    "SplitError", "SplitResult", "ToolError", "WavError", "WavInfo", "build_bank", "build_manifest",
+    "convert_data", "convert_file", "convert_files", "extract_samples", "load_manifest", "open_wav",
+    "output_path_for", "parse_rate", "parse_samples", "read_pcm", "scan_samples", "select_banks",
+]
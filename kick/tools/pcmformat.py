@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# pcmformat.py — flash storage formats for 16‑bit PCM: 16‑bit, packed 10‑bit, 8‑bit
+# MIT‑like license, standard library only
+
+import random
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, Optional
+
+import adpcm
+
+# Format ids as stored in sample_formats[]; keep in sync with SAMPLE_FMT_* in
+# the generated samples.h and the reader table in kick/src/main.cpp.
+FORMAT_IDS: Dict[str, int] = {"pcm16": 0, "pcm10": 1, "pcm8": 2, "adpcm": 3}
+FORMAT_BITS: Dict[str, int] = {"pcm16": 16, "pcm10": 10, "pcm8": 8, "adpcm": 4}
+# Plain PCM word sizes selectable with --bits; ADPCM is a codec of its own
+FORMAT_FOR_BITS: Dict[int, str] = {16: "pcm16", 10: "pcm10", 8: "pcm8"}
+
+DITHER_SEED = 0x5EED  # fixed so rebuilds (and the manifest cache) are reproducible
+
+
+def bytes_per_frames(frames: int, fmt: str) -> int:
+    """Storage size in bytes of frames samples (pcm10 packs 4 samples in 5 bytes)."""
+    if fmt == "pcm16":
+        return frames * 2
+    if fmt == "pcm10":
+        return -(-frames // 4) * 5
+    if fmt == "adpcm":
+        return -(-frames // adpcm.BLOCK_SAMPLES) * adpcm.BLOCK_BYTES
+    return frames
+
+
+def frames_in(size: int, fmt: str) -> int:
+    """Number of samples size bytes of storage hold, padding included.
+
+    A partial last pcm10 group or ADPCM block is padded with silence, so
+    for those formats this can exceed the encoder's frames; *_LEN uses
+    PcmEncoder.frames.
+    """
+    if fmt == "pcm16":
+        return size // 2
+    if fmt == "pcm10":
+        return size // 5 * 4
+    if fmt == "adpcm":
+        return size // adpcm.BLOCK_BYTES * adpcm.BLOCK_SAMPLES
+    return size
+
+
+def _pcm16_samples(chunk: bytes) -> array:
+    samples = array("h")
+    samples.frombytes(chunk)  # any bytes-like, including a memoryview into a mapped WAV
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+class Quantizer:
+    """Requantise int16 samples to fewer bits with optional TPDF dither.
+
+    The dither is triangular, ±1 LSB of the target word, from a seeded
+    generator so the same input always gives the same output.
+    """
+
+    def __init__(self, bits: int, dither: bool = True, seed: int = DITHER_SEED):
+        self.shift = 16 - bits
+        self.lo = -(1 << (bits - 1))
+        self.hi = (1 << (bits - 1)) - 1
+        self.dither = dither
+        self._rng = random.Random(seed)
+
+    def __call__(self, samples: Iterable[int]) -> array:
+        step = float(1 << self.shift)
+        lo, hi = self.lo, self.hi
+        out = array("h")
+        if self.dither:
+            rnd = self._rng.random
+            for x in samples:
+                q = int(x / step + rnd() - rnd() + 32768.5) - 32768  # floor(v + 0.5) for negative v too
+                out.append(lo if q < lo else hi if q > hi else q)
+        else:
+            for x in samples:
+                q = int(x / step + 32768.5) - 32768
+                out.append(lo if q < lo else hi if q > hi else q)
+        return out
+
+
+class PcmEncoder:
+    """Turn little‑endian int16 PCM chunks into one storage format, chunk by chunk."""
+
+    def __init__(self, fmt: str, dither: bool = True, seed: int = DITHER_SEED):
+        if fmt not in FORMAT_IDS:
+            raise ValueError(f"Unknown storage format: {fmt}")
+        self.fmt = fmt
+        self.frames = 0
+        self._quantize = Quantizer(FORMAT_BITS[fmt], dither, seed) if fmt in ("pcm10", "pcm8") else None
+        self._adpcm = adpcm.AdpcmEncoder() if fmt == "adpcm" else None
+        self._carry = array("h")  # pcm10: samples waiting for a full group of 4
+
+    def encode(self, chunk: bytes) -> bytes:
+        if self.fmt == "pcm16":
+            self.frames += len(chunk) // 2
+            return chunk
+        if self._adpcm:
+            samples = _pcm16_samples(chunk)
+            self.frames += len(samples)
+            return self._adpcm.encode(samples)
+        q = self._quantize(_pcm16_samples(chunk))
+        self.frames += len(q)
+        if self.fmt == "pcm8":
+            return array("b", q).tobytes()
+        # pcm10: 4 samples → one 40‑bit little‑endian group
+        if self._carry:
+            q = self._carry + q
+        whole = len(q) - len(q) % 4
+        self._carry = q[whole:]
+        return _pack10(q[:whole])
+
+    def flush(self) -> bytes:
+        """Pad and emit a trailing partial pcm10 group or ADPCM block, if any."""
+        if self._adpcm:
+            return self._adpcm.flush()
+        if self.fmt != "pcm10" or not self._carry:
+            return b""
+        group = self._carry + array("h", [0] * (4 - len(self._carry)))
+        self._carry = array("h")
+        return _pack10(group)
+
+
+def _pack10(samples: array) -> bytes:
+    out = bytearray()
+    for i in range(0, len(samples), 4):
+        word = ((samples[i] & 0x3FF) | (samples[i + 1] & 0x3FF) << 10
+                | (samples[i + 2] & 0x3FF) << 20 | (samples[i + 3] & 0x3FF) << 30)
+        out += word.to_bytes(5, "little")
+    return bytes(out)
+
+
+def encode_chunks(chunks: Iterable[bytes], fmt: str, dither: bool = True,
+                  encoder: Optional[PcmEncoder] = None) -> Iterator[bytes]:
+    """Re‑encode a stream of int16 PCM chunks; pass encoder to read .frames afterwards."""
+    encoder = encoder or PcmEncoder(fmt, dither)
+    for chunk in chunks:
+        data = encoder.encode(chunk)
+        if data:
+            yield data
+    tail = encoder.flush()
+    if tail:
+        yield tail
+
+
+def decode(data: bytes, fmt: str, frames: Optional[int] = None) -> array:
+    """Reference decoder to int16, bit‑for‑bit what the firmware's readPCM* return.
+
+    frames, the encoder's sample count, drops the padding of a partial last
+    pcm10 group or ADPCM block.
+    """
+    if fmt == "pcm16":
+        return _pcm16_samples(data)
+    if fmt == "pcm8":
+        return array("h", ((b - 256 if b > 127 else b) << 8 for b in data))
+    if fmt == "adpcm":
+        return adpcm.decode(data, frames)
+    out = array("h")
+    for g in range(0, len(data) - len(data) % 5, 5):
+        word = int.from_bytes(data[g:g + 5], "little")
+        for k in range(4):
+            v = (word >> (10 * k)) & 0x3FF
+            out.append((v - 1024 if v > 511 else v) << 6)
+    if frames is not None:
+        del out[frames:]
+    return out
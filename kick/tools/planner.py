@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# planner.py — fit a set of WAVs into a board's flash by choosing per‑sample rate, format and trim
+# MIT‑like license, standard library only (NumPy speeds up resampling when installed)
+#
+# Every sample gets one option out of rate × storage format × trim.  Each
+# option has an exact flash cost and an estimated quality: the SNR at the
+# PWM output against the untouched source, from the noise each stage adds
+#   rate    energy lost going down to the rate and back (band limiting)
+#   storage requantisation/codec error, measured on what the PWM outputs
+#   trim    energy of the cut lead‑in and tail
+# capped at the 10‑bit PWM's own dynamic range.  The plan maximises the sum
+# of per‑sample SNRs within the budget (a multiple‑choice knapsack, solved
+# exactly over 1 KiB units).
+
+import argparse
+import configparser
+import math
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import convert
+import headers
+import pcmformat
+import resample
+import trim
+import wavin
+from quality_report import at_pwm, to_le_bytes
+
+KIB = 1024
+MIB = 1024 * 1024
+
+PWM_BITS = 10
+SNR_CAP_DB = 6.02 * PWM_BITS + 1.76  # nothing sounds better than the PWM itself
+GRANULE = KIB                        # knapsack resolution; costs are rounded up to it
+ALIGN = 4                            # samples.S pads every array to .balign 4
+FIRMWARE_RESERVE = 256 * KIB         # Arduino core + player code, kept free of samples
+
+
+@dataclass(frozen=True)
+class Board:
+    """What the planner needs to know about one firmware target."""
+    flash_bytes: int
+    sys_clock_hz: float
+    formats: Tuple[str, ...]  # storage formats the firmware can play
+    writes_bank: bool = True  # False: plan only, --output-dir has no layout for this firmware
+
+
+# PlatformIO board ids used in this repo.  kick/src/main.cpp plays every format
+# from samples/samples.h.  sample_player_v1 only plays 16‑bit PCM and takes a
+# hand-filled include/sample.h of 18 fixed arrays, so it can be planned for
+# but the bank written here does not fit it.
+BOARDS: Dict[str, Board] = {
+    "seeed-xiao-rp2040": Board(2 * MIB, 125_000_000, tuple(pcmformat.FORMAT_IDS)),
+    "seeed_xiao_rp2350": Board(2 * MIB, 150_000_000, ("pcm16",), writes_bank=False),
+}
+
+
+@dataclass(frozen=True)
+class Option:
+    """One way of storing one sample."""
+    rate: float
+    storage: str
+    trim: bool
+    frames: int
+    size: int
+    snr_db: float
+
+
+@dataclass
+class Budget:
+    board_id: Optional[str]
+    total: int  # bytes available for sample data
+    sys_clock_hz: float
+    formats: Tuple[str, ...]
+    writes_bank: bool = True
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte count such as 1572864, 1536k, 1.5m (binary units, as in platformio.ini)."""
+    text = value.strip().lower().rstrip("b")
+    scale = {"k": KIB, "m": MIB}.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    try:
+        size = int(float(text) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size such as 1536k or 1.5m, got {value!r}")
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"size must not be negative, got {value!r}")
+    return size
+
+
+def read_board(ini_path: Path, env: Optional[str] = None, reserve: int = FIRMWARE_RESERVE) -> Budget:
+    """Budget for sample data from a platformio.ini env: flash - filesystem - firmware reserve."""
+    config = configparser.ConfigParser(inline_comment_prefixes=(";", "#"))
+    if not config.read(ini_path):
+        raise ValueError(f"Cannot read {ini_path}")
+    envs = [s for s in config.sections() if s.startswith("env:")]
+    if env:
+        envs = [s for s in envs if s == f"env:{env}"]
+    if len(envs) != 1:
+        raise ValueError(f"{ini_path}: expected one [env:...] section" + (f" named {env}" if env else "")
+                         + f", found {len(envs)}")
+    section = config[envs[0]]
+    board_id = section.get("board", "").strip()
+    if board_id not in BOARDS:
+        raise ValueError(f"{ini_path}: unknown board {board_id!r}; pass --budget instead "
+                         f"(known: {', '.join(sorted(BOARDS))})")
+    board = BOARDS[board_id]
+    filesystem = parse_size(section.get("board_build.filesystem_size", "0"))
+    return Budget(board_id, board.flash_bytes - filesystem - reserve, board.sys_clock_hz, board.formats,
+                  board.writes_bank)
+
+
+def _mean_square(samples: Sequence[int]) -> float:
+    return sum(x * x for x in samples) / len(samples) if samples else 0.0
+
+
+def _mean_square_error(a: Sequence[int], b: Sequence[int]) -> float:
+    n = min(len(a), len(b))
+    return sum((x - y) * (x - y) for x, y in zip(a, b)) / n if n else 0.0
+
+
+def _frames_after_resample(frames: int, src_rate: float, rate: float) -> int:
+    if rate == src_rate:
+        return frames
+    ratio = resample.rate_ratio(src_rate, rate)
+    return -(-frames * ratio.numerator // ratio.denominator)
+
+
+def read_source(path: Path, max_seconds: int, dither: bool = True) -> Tuple[array, int]:
+    """Mono 16‑bit samples of path, up to max_seconds, and the WAV's rate."""
+    with wavin.open_wav(path, dither) as w:
+        rate = w.getframerate()
+        data = w.readframes(min(rate * max_seconds, w.getnframes()))
+    samples = array("h", data)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples, rate
+
+
+def sample_options(source: array, src_rate: int, rates: Sequence[float], formats: Sequence[str],
+                   trim_db: float, dither: bool = True) -> List[Option]:
+    """Cost and estimated quality of every rate × format × trim choice for one sample."""
+    signal = _mean_square(source)
+    points = trim.analyze([to_le_bytes(source)], src_rate, trim_db)
+    cut = source[:points.start] + source[points.end:]
+    trim_noise = _mean_square(cut) * len(cut) / len(source) if source else 0.0
+
+    options = []
+    for rate in rates:
+        if rate == src_rate:
+            at_rate, rate_noise = source, 0.0
+        else:
+            at_rate = resample.resample(source, src_rate, rate)
+            back = resample.resample(at_rate, rate, src_rate)
+            rate_noise = _mean_square_error(source, back)
+        reference = at_pwm(at_rate)
+        for fmt in formats:
+            if fmt == "pcm16":
+                format_noise = 0.0  # bit‑exact at the PWM
+            else:
+                encoder = pcmformat.PcmEncoder(fmt, dither)
+                stored = encoder.encode(to_le_bytes(at_rate)) + encoder.flush()
+                format_noise = _mean_square_error(reference, at_pwm(pcmformat.decode(stored, fmt, encoder.frames)))
+            for trimmed in (False, True):
+                kept = points.kept if trimmed else len(source)
+                frames = _frames_after_resample(kept, src_rate, rate)
+                noise = rate_noise + format_noise + (trim_noise if trimmed else 0.0)
+                if signal == 0 or noise == 0:
+                    snr = SNR_CAP_DB
+                else:
+                    snr = min(SNR_CAP_DB, 10 * math.log10(signal / noise))
+                options.append(Option(rate, fmt, trimmed, frames, pcmformat.bytes_per_frames(frames, fmt), snr))
+    return options
+
+
+def plan(choices: List[List[Option]], budget: int) -> Optional[List[Option]]:
+    """Pick one option per sample maximising total SNR with total size within budget.
+
+    Returns None if even the smallest options do not fit.  Ties go to the
+    smaller plan.
+    """
+    units = budget // GRANULE
+    cost = [[-(-(o.size + ALIGN - 1) // GRANULE) for o in opts] for opts in choices]
+    best: List[float] = [0.0] + [-math.inf] * units  # best[c]: max SNR sum using exactly c units
+    picks: List[List[int]] = []
+    for opts, costs in zip(choices, cost):
+        nxt = [-math.inf] * (units + 1)
+        pick = [-1] * (units + 1)
+        for k, (o, w) in enumerate(zip(opts, costs)):
+            for c in range(w, units + 1):
+                if best[c - w] > -math.inf:
+                    q = best[c - w] + o.snr_db
+                    if q > nxt[c] + 1e-9:
+                        nxt[c], pick[c] = q, k
+        best = nxt
+        picks.append(pick)
+
+    top = max(best)
+    if top == -math.inf:
+        return None
+    c = next(c for c, q in enumerate(best) if q >= top - 1e-9)
+    chosen: List[Option] = []
+    for opts, costs, pick in zip(reversed(choices), reversed(cost), reversed(picks)):
+        k = pick[c]
+        chosen.append(opts[k])
+        c -= costs[k]
+    return chosen[::-1]
+
+
+def print_table(files: Sequence[Path], chosen: Sequence[Option], budget: Budget) -> None:
+    print(f"{'sample':<9} {'file':<34} {'rate':>8} {'storage':>7} {'trim':>4} {'sec':>6} {'KiB':>8} {'SNR dB':>7}")
+    for i, (path, o) in enumerate(zip(files, chosen)):
+        print(f"{headers.sample_name_for(i):<9} {path.name[:34]:<34} {o.rate:>8.0f} {o.storage:>7} "
+              f"{'yes' if o.trim else 'no':>4} {o.frames / o.rate:>6.2f} {o.size / KIB:>8.1f} {o.snr_db:>7.1f}")
+    used = sum(o.size for o in chosen)
+    print(f"{'total':<9} {'':<34} {'':>8} {'':>7} {'':>4} {sum(o.frames / o.rate for o in chosen):>6.2f} "
+          f"{used / KIB:>8.1f} {sum(o.snr_db for o in chosen) / len(chosen):>7.1f} (mean)")
+    target = f" on {budget.board_id}" if budget.board_id else ""
+    print(f"Uses {used / KIB:.1f} of {budget.total / KIB:.1f} KiB{target} ({100 * used / budget.total:.1f}%)")
+
+
+def write_bank(files: Sequence[Path], chosen: Sequence[Option], output_dir: Path, emit: str,
+               max_seconds: int, dither: bool, trim_db: float, incbin_prefix: Optional[str] = None,
+               verbose: bool = False) -> int:
+    """Convert every file with its planned options and write the bank; returns bytes written.
+
+    Raises ConversionError at the first file that fails.
+    """
+    names = [headers.sample_name_for(i) for i in range(len(files))]
+    total = 0
+    lengths = []
+    for path, name, o in zip(files, names, chosen):
+        options = convert.ConvertOptions(
+            max_seconds=max_seconds,
+            fmt="c16" if emit == "headers" else "hex",
+            emit=emit,
+            rate=o.rate,
+            storage=o.storage,
+            dither=dither,
+            trim_silence=o.trim,
+            trim_db=trim_db,
+        )
+        result = convert.process_file(path, output_dir, verbose, options, name)
+        total += result.byte_count
+        lengths.append(result.frames)
+    if emit == "headers":
+        master_file = headers.write_master_header(output_dir, names)
+    else:
+        master_file = headers.write_incbin_bank(output_dir, names, incbin_prefix, [o.storage for o in chosen],
+                                                lengths)
+    print(f"Created master include file: {master_file}")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Choose per-sample rate, bit depth, codec and trimming so a set of WAVs fits a "
+                    "board's flash with the best overall quality, then optionally write the bank",
+        epilog="Quality is the estimated SNR at the PWM output against the source, capped at "
+               f"{SNR_CAP_DB:.0f} dB (the 10-bit PWM). The plan maximises the sum over samples."
+    )
+    parser.add_argument("files", nargs="+", type=Path, help="WAV files, in bank order")
+    parser.add_argument("--board", type=Path, default=Path(__file__).resolve().parent.parent / "platformio.ini",
+                        help="platformio.ini (or its project directory) to take the board from "
+                             "(default: the kick project's)")
+    parser.add_argument("--env", help="PlatformIO env to use when the file has several")
+    parser.add_argument("--budget", type=parse_size,
+                        help="Bytes available for samples, e.g. 1536k; overrides the board's flash size")
+    parser.add_argument("--reserve", type=parse_size, default=FIRMWARE_RESERVE,
+                        help=f"Flash kept for the firmware itself (default: {FIRMWARE_RESERVE // KIB}k)")
+    parser.add_argument("--rates", default="source,isr",
+                        help="Comma-separated candidate rates: 'source' (keep the WAV's), 'isr' (the "
+                             "board's PWM interrupt rate) or Hz (default: source,isr)")
+    parser.add_argument("--formats",
+                        help="Comma-separated storage formats to consider (default: all the board's "
+                             f"firmware can play, from {', '.join(pcmformat.FORMAT_IDS)})")
+    parser.add_argument("--trim-db", type=float, default=trim.THRESHOLD_DBFS,
+                        help=f"Silence gate when trimming is chosen (default: {trim.THRESHOLD_DBFS:g} dBFS)")
+    parser.add_argument("--no-dither", action="store_true", help="Round instead of dithering reduced-bit formats")
+    parser.add_argument("--max-seconds", type=int, default=convert.MAX_SECONDS,
+                        help=f"Maximum seconds per file (default: {convert.MAX_SECONDS})")
+    parser.add_argument("-o", "--output-dir", type=Path, help="Write the planned bank here (default: plan only)")
+    parser.add_argument("--emit", choices=["headers", "incbin"], default="incbin",
+                        help="Bank form written with --output-dir, as in convert.py (default: incbin)")
+    parser.add_argument("--incbin-prefix", help="As in convert.py --incbin-prefix")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show detailed conversion information")
+    args = parser.parse_args()
+
+    if len(args.files) > convert.MAX_FILES:
+        print(f"Error: Too many files specified ({len(args.files)}). The limit is {convert.MAX_FILES}.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        ini = args.board / "platformio.ini" if args.board.is_dir() else args.board
+        budget = read_board(ini, args.env, args.reserve)
+    except (ValueError, configparser.Error) as e:
+        if args.budget is None:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        budget = Budget(None, 0, resample.SYS_CLOCK_HZ, tuple(pcmformat.FORMAT_IDS))
+    if args.budget is not None:
+        budget.total = args.budget
+    if args.output_dir and not budget.writes_bank:
+        print(f"Error: the {budget.board_id} firmware reads a hand-filled include/sample.h, not the "
+              "samples/samples.h bank --output-dir writes; plan without --output-dir and fill it in by hand",
+              file=sys.stderr)
+        sys.exit(1)
+
+    formats = budget.formats
+    if args.formats:
+        formats = tuple(f.strip() for f in args.formats.split(","))
+        unknown = [f for f in formats if f not in pcmformat.FORMAT_IDS]
+        if unknown:
+            print(f"Error: unknown storage format(s): {', '.join(unknown)}", file=sys.stderr)
+            sys.exit(1)
+        unplayable = [f for f in formats if f not in budget.formats]
+        if unplayable:
+            print(f"Warning: the {budget.board_id} firmware cannot play {', '.join(unplayable)}", file=sys.stderr)
+
+    isr = resample.isr_rate(budget.sys_clock_hz)
+    choices = []
+    for path in args.files:
+        try:
+            source, src_rate = read_source(path, args.max_seconds, not args.no_dither)
+        except (OSError, EOFError, wave.Error, ValueError) as e:
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        rates = []
+        for token in args.rates.split(","):
+            token = token.strip().lower()
+            rate = src_rate if token == "source" else isr if token == "isr" else convert.parse_rate(token)
+            if rate not in rates:
+                rates.append(rate)
+        choices.append(sample_options(source, src_rate, rates, formats, args.trim_db, not args.no_dither))
+        if args.verbose:
+            print(f"Analysed: {path.name} ({len(choices[-1])} options)")
+
+    chosen = plan(choices, budget.total)
+    if chosen is None:
+        smallest = sum(min(o.size for o in opts) for opts in choices)
+        print(f"Error: does not fit: the smallest options need {smallest / KIB:.1f} KiB, "
+              f"the budget is {budget.total / KIB:.1f} KiB", file=sys.stderr)
+        sys.exit(1)
+    print_table(args.files, chosen, budget)
+
+    if args.output_dir:
+        print()
+        try:
+            written = write_bank(args.files, chosen, args.output_dir, args.emit, args.max_seconds,
+                                 not args.no_dither, args.trim_db, args.incbin_prefix, args.verbose)
+        except convert.ConversionError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nWrote {written} bytes of sample data ({written / KIB:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
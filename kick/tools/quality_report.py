@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# quality_report.py — SNR and flash cost of each storage format, per WAV
+# MIT‑like license, standard library only
+
+import argparse
+import math
+import sys
+import wave
+from array import array
+from pathlib import Path
+from typing import List, Sequence
+
+import pcmformat
+import wavin
+
+PWM_SHIFT = 6  # on_pwm_wrap: 16‑bit sample → 10‑bit PWM level
+
+
+def snr_db(reference: Sequence[int], test: Sequence[int]) -> float:
+    """Signal‑to‑noise ratio of test against reference, in dB."""
+    signal = sum(x * x for x in reference)
+    noise = sum((x - y) * (x - y) for x, y in zip(reference, test))
+    if noise == 0:
+        return math.inf
+    if signal == 0:
+        return -math.inf
+    return 10 * math.log10(signal / noise)
+
+
+def at_pwm(samples: Sequence[int]) -> List[int]:
+    """What the firmware writes to the PWM, back on the 16‑bit scale."""
+    return [(((x + 32768) >> PWM_SHIFT) << PWM_SHIFT) - 32768 for x in samples]
+
+
+def read_pcm16(path: Path) -> array:
+    return wavin.read_pcm(path).samples()
+
+
+def to_le_bytes(samples: array) -> bytes:
+    """int16 samples as little‑endian PCM, the encoders' input."""
+    if sys.byteorder == "little":
+        return samples.tobytes()
+    swapped = array("h", samples)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report SNR and flash size of each storage format for the given WAV files",
+        epilog="'src' is SNR against the 16-bit source; 'pwm' compares what the 10-bit PWM "
+               "actually outputs, which is the ceiling for any format."
+    )
+    parser.add_argument("files", nargs="+", type=Path, help="WAV files (converted to mono 16-bit as convert.py does)")
+    parser.add_argument("--no-dither", action="store_true", help="Evaluate plain rounding instead of TPDF dither")
+    args = parser.parse_args()
+
+    formats = list(pcmformat.FORMAT_IDS)
+    header = f"{'file':<36}" + "".join(f" {fmt + ' src':>10} {fmt + ' pwm':>10} {fmt + ' KB':>9}" for fmt in formats)
+    print(header)
+    totals = {fmt: 0 for fmt in formats}
+    for path in args.files:
+        try:
+            source = read_pcm16(path)
+        except (OSError, EOFError, wave.Error, ValueError) as e:
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        reference_pwm = at_pwm(source)
+        row = f"{path.name[:36]:<36}"
+        for fmt in formats:
+            encoder = pcmformat.PcmEncoder(fmt, dither=not args.no_dither)
+            stored = encoder.encode(to_le_bytes(source)) + encoder.flush()
+            decoded = pcmformat.decode(stored, fmt, encoder.frames)
+            totals[fmt] += len(stored)
+            row += (f" {snr_db(source, decoded):>10.1f} {snr_db(reference_pwm, at_pwm(decoded)):>10.1f}"
+                    f" {len(stored) / 1024:>9.1f}")
+        print(row)
+    print(f"{'total':<36}" + "".join(f" {'':>10} {'':>10} {totals[fmt] / 1024:>9.1f}" for fmt in formats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# resample.py — band‑limited polyphase resampling of 16‑bit PCM
+# MIT‑like license, standard library only (NumPy is used when installed)
+
+import math
+import sys
+from array import array
+from fractions import Fraction
+from functools import lru_cache
+from operator import mul
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional fast path
+    np = None
+
+# kick/src/main.cpp: the IRQ slice wraps every PWM_WRAP + 1 system clocks at
+# clkdiv 1 and the ISR advances one sample per wrap at 1.0x speed.
+SYS_CLOCK_HZ = 125_000_000
+PWM_WRAP = 4095
+ISR_RATE_HZ = SYS_CLOCK_HZ / (PWM_WRAP + 1)  # ≈ 30517.6 Hz
+
+HALF_TAPS = 16        # filter taps either side of the output instant
+ROLLOFF = 0.94        # passband edge as a fraction of the lower Nyquist
+KAISER_BETA = 8.6     # ≈ 85 dB stopband
+MAX_PHASES = 1024     # at most this many filter phases, i.e. up <= MAX_PHASES
+
+
+def isr_rate(sys_clock_hz: float = SYS_CLOCK_HZ, wrap: int = PWM_WRAP, clkdiv: float = 1.0) -> float:
+    """Return the PWM wrap interrupt rate, i.e. the firmware's playback rate at 1.0x."""
+    return sys_clock_hz / (clkdiv * (wrap + 1))
+
+
+def _bessel_i0(x: float) -> float:
+    total, term, k = 1.0, 1.0, 1
+    while term > 1e-12 * total:
+        term *= (x / (2 * k)) ** 2
+        total += term
+        k += 1
+    return total
+
+
+@lru_cache(maxsize=16)
+def design_phases(up: int, down: int, half_taps: int = HALF_TAPS, rolloff: float = ROLLOFF,
+                  beta: float = KAISER_BETA) -> Tuple[Tuple[float, ...], ...]:
+    """Kaiser‑windowed sinc filter bank, one row of 2*half_taps coefficients per phase.
+
+    Row p weights input samples i-half_taps+1 .. i+half_taps for an output
+    instant p/up of a sample past input sample i.  Each row is normalised to
+    unity DC gain.  Banks are cached per ratio, since a batch of files at
+    one source rate would otherwise redesign the same filter for each file.
+    """
+    cutoff = rolloff * min(1.0, up / down)  # relative to the input Nyquist
+    i0_beta = _bessel_i0(beta)
+    phases = []
+    for p in range(up):
+        frac = p / up
+        row = []
+        for k in range(-half_taps + 1, half_taps + 1):
+            t = k - frac
+            x = math.pi * cutoff * t
+            sinc = 1.0 if x == 0 else math.sin(x) / x
+            r = t / half_taps
+            window = _bessel_i0(beta * math.sqrt(1 - r * r)) / i0_beta if abs(r) < 1 else 0.0
+            row.append(sinc * window)
+        gain = sum(row)
+        phases.append(tuple(c / gain for c in row))
+    return tuple(phases)
+
+
+def rate_ratio(src_rate: float, dst_rate: float, max_phases: int = MAX_PHASES) -> Fraction:
+    """Return up/down ≈ dst_rate/src_rate with up <= max_phases.
+
+    up is the phase count.  limit_denominator() bounds down, which is at
+    least up when downsampling; when upsampling the inverse ratio is
+    approximated instead so that up is the bounded term.
+    """
+    ratio = Fraction(dst_rate) / Fraction(src_rate)
+    if ratio <= 1:
+        return ratio.limit_denominator(max_phases)
+    return 1 / (1 / ratio).limit_denominator(max_phases)
+
+
+class Resampler:
+    """Streaming polyphase resampler for int16 samples.
+
+    Feed input with process() in chunks of any size and call flush() once at
+    the end; the concatenated outputs are the same as one resample() call.
+    Output length is ceil(len(input) * up / down).
+    """
+
+    def __init__(self, src_rate: float, dst_rate: float, half_taps: int = HALF_TAPS):
+        ratio = rate_ratio(src_rate, dst_rate)
+        self.up, self.down = ratio.numerator, ratio.denominator
+        self.half_taps = half_taps
+        self.phases = design_phases(self.up, self.down, half_taps)
+        self._np_phases = np.array(self.phases).T.copy() if np is not None else None  # taps × phases
+        # Input history; _buf[0] is absolute input index _base
+        self._buf: List[int] = [0] * (half_taps - 1)
+        self._base = -(half_taps - 1)
+        self._received = 0
+        self._n = 0  # next output index
+
+    def _emit(self, limit: int) -> array:
+        """Produce outputs whose filter window ends before absolute index limit."""
+        h, up, down = self.half_taps, self.up, self.down
+        # Largest n with floor(n*down/up) + h < limit
+        last = ((limit - h) * up - 1) // down
+        count = last - self._n + 1
+        if count <= 0:
+            return array("h")
+        if self._np_phases is not None:
+            out = self._emit_numpy(count)
+        else:
+            out = array("h", bytes(2 * count))
+            buf, phases, base = self._buf, self.phases, self._base
+            n = self._n
+            for o in range(count):
+                pos = (n + o) * down
+                j = pos // up - base
+                acc = sum(map(mul, phases[pos % up], buf[j - h + 1:j + h + 1]))
+                acc = int(acc + 0.5) if acc >= 0 else -int(-acc + 0.5)
+                out[o] = 32767 if acc > 32767 else -32768 if acc < -32768 else acc
+        self._n += count
+        # Drop history no later output can reach
+        keep_from = (self._n * down) // up - h + 1 - self._base
+        if keep_from > 0:
+            del self._buf[:keep_from]
+            self._base += keep_from
+        return out
+
+    def _emit_numpy(self, count: int) -> array:
+        # Same arithmetic as the pure Python loop, so both paths give identical
+        # samples: products summed tap by tap from the left, then rounded half
+        # away from zero.
+        h = self.half_taps
+        n = np.arange(self._n, self._n + count, dtype=np.int64)
+        pos = n * self.down
+        j = pos // self.up - self._base
+        taps = np.arange(-h + 1, h + 1)
+        buf = np.asarray(self._buf, dtype=np.float64)
+        out = np.empty(count, dtype=np.float64)
+        step = 8192  # bound the (outputs × taps) gather matrix
+        for s in range(0, count, step):
+            window = buf[taps[:, None] + j[None, s:s + step]]  # taps × outputs
+            coeffs = self._np_phases[:, pos[s:s + step] % self.up]
+            acc = coeffs[0] * window[0]
+            for t in range(1, 2 * h):
+                acc += coeffs[t] * window[t]
+            out[s:s + step] = acc
+        out = np.where(out >= 0, np.floor(out + 0.5), -np.floor(-out + 0.5))
+        pcm = np.clip(out, -32768, 32767).astype(np.int16)
+        return array("h", pcm.tobytes())
+
+    def process(self, samples: Iterable[int]) -> array:
+        """Add input samples and return every output that is now fully determined."""
+        before = len(self._buf)
+        self._buf.extend(samples)
+        self._received += len(self._buf) - before
+        return self._emit(self._received)
+
+    def flush(self) -> array:
+        """Zero‑pad the tail and return the remaining outputs."""
+        self._buf.extend([0] * self.half_taps)
+        return self._emit(self._received + self.half_taps)
+
+
+def resample(samples: Sequence[int], src_rate: float, dst_rate: float) -> array:
+    """Resample a whole int16 sequence; see Resampler."""
+    r = Resampler(src_rate, dst_rate)
+    out = r.process(samples)
+    out.extend(r.flush())
+    return out
+
+
+def resample_pcm_chunks(chunks: Iterable[bytes], src_rate: float, dst_rate: float) -> Iterator[bytes]:
+    """Resample a stream of little‑endian int16 PCM byte chunks."""
+    r = Resampler(src_rate, dst_rate)
+    for chunk in chunks:
+        samples = array("h")
+        samples.frombytes(chunk)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        out = r.process(samples)
+        if out:
+            if sys.byteorder == "big":
+                out.byteswap()
+            yield out.tobytes()
+    out = r.flush()
+    if out:
+        if sys.byteorder == "big":
+            out.byteswap()
+        yield out.tobytes()
@@ -1,124 +1,327 @@
 #!/usr/bin/env python3
 # split_samples.py - Extract individual sample arrays into separate header files
+#
+# The input is read in fixed-size chunks and lexed as it goes: array
+# bodies are decoded into bytes a chunk at a time and written straight
+# back out as sampleNN.h, so memory stays flat however large the pasted
+# header is.  Values may be hex, decimal or octal, separated by any mix of
+# commas and whitespace, with /* */ and // comments anywhere.
 
+import argparse
+import io
 import re
+import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
+import headers
+import hexfmt
+from errors import SplitError
+from pcmformat import frames_in
 
-def extract_samples(input_file: Path, output_dir: Path) -> None:
-    """Extract each sample array into its own header file."""
-    
-    # Read the input file
-    content = input_file.read_text()
-    
-    # Create output directory if it doesn't exist
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Pattern to match sample arrays
-    pattern = r'const uint8_t (sample\d+)\[\] PROGMEM = \{([^}]+)\};'
-    
-    matches = re.findall(pattern, content, re.DOTALL)
-    
-    print(f"Found {len(matches)} sample arrays")
-    
-    valid_samples = []
+READ_CHUNK = 1 << 16  # bytes of input lexed at a time
 
-    for sample_name, sample_data in matches:
-        # Clean up the sample data (remove extra whitespace and comments)
-        cleaned_data = re.sub(r'/\*[^*]*\*/', '', sample_data)  # Remove comments
-        cleaned_data = re.sub(r'\s+', ' ', cleaned_data.strip())  # Normalize whitespace
+# Start of an array body; everything up to the closing brace is values
+SAMPLE_ARRAY = re.compile(rb'const\s+uint8_t\s+(sample\d+)\s*\[\s*\]\s*PROGMEM\s*=\s*\{')
+_DECL_TAIL = 256  # bytes kept between chunks while looking for a declaration split across them
+_COMMENT = re.compile(rb'/\*.*?\*/|//[^\n]*\n', re.DOTALL)
+_COMMENT_AT_EOF = re.compile(rb'/\*.*?\*/|//[^\n]*', re.DOTALL)
+_SEPARATORS = (b",", b" ", b"\n", b"\t", b"\r")
 
-        # Skip empty samples (placeholders)
-        if not cleaned_data or cleaned_data.strip() == '' or 'placeholder' in cleaned_data.lower():
-            print(f"Skipping empty sample: {sample_name}")
-            continue
 
-        valid_samples.append(sample_name)
+def _token_table() -> Dict[bytes, int]:
+    """Every common spelling of a byte value, so most tokens decode with one dict lookup."""
+    table: Dict[bytes, int] = {}
+    for v in range(256):
+        for spelling in (f"0x{v:02X}", f"0x{v:02x}", f"0X{v:02X}", f"0x{v:X}", f"0x{v:x}", str(v)):
+            table[spelling.encode()] = v
+    return table
 
-        # Format the hex data with proper line breaks (16 bytes per line)
-        hex_values = cleaned_data.split(', ')
-        formatted_lines = []
-        for i in range(0, len(hex_values), 16):
-            line = ', '.join(hex_values[i:i+16])
-            if i + 16 < len(hex_values):
-                line += ','
-            formatted_lines.append(f"    {line}")
 
-        formatted_data = '\n'.join(formatted_lines)
+_TOKENS = _token_table()
 
-        # Create header file content
-        header_content = f"""#ifndef {sample_name.upper()}_H
-#define {sample_name.upper()}_H
 
-#include <pgmspace.h>
+def _decode(tokens: List[bytes], name: str) -> bytes:
+    """The byte values of an array's tokens; SplitError for anything that is not 0..255."""
+    try:
+        return bytes(map(_TOKENS.__getitem__, tokens))
+    except KeyError:
+        pass
+    out = bytearray()
+    for token in tokens:
+        value = _TOKENS.get(token)
+        if value is None:
+            try:
+                text = token.decode("ascii").rstrip("uU")
+                # C octal is a bare leading zero, which Python's int(..., 0) refuses
+                value = int(text, 8) if text[:1] == "0" and text.isdigit() else int(text, 0)
+            except (UnicodeDecodeError, ValueError):
+                value = -1
+            if not 0 <= value <= 255:
+                raise SplitError(f"{name}: {token.decode('ascii', 'replace')!r} is not a byte value")
+        out.append(value)
+    return bytes(out)
 
-// Sample data for {sample_name}
-const uint8_t {sample_name}[] PROGMEM = {{
-{formatted_data}
-}};
 
-// Sample length in 16-bit units
-#define {sample_name.upper()}_LEN ((uint32_t)(sizeof({sample_name}) / 2))
+# Lexer events: ("begin", name), ("data", bytes) one or more times, ("end", name)
+Event = Tuple[str, Union[str, bytes]]
 
-#endif // {sample_name.upper()}_H
-"""
 
-        # Write to individual header file
-        output_file = output_dir / f"{sample_name}.h"
-        output_file.write_text(header_content)
+def _blank_comments(text: bytes, eof: bool) -> bytes:
+    """text with every complete comment overwritten by spaces, so offsets still line up."""
+    pattern = _COMMENT_AT_EOF if eof else _COMMENT
+    return pattern.sub(lambda m: b" " * len(m.group(0)), text)
 
-        print(f"Created: {output_file}")
-    
-    # Create a master include file
-    # Create a master include file only for valid samples
-    master_content = """#ifndef SAMPLES_H
-#define SAMPLES_H
 
-// Include all individual sample headers
-"""
+def _open_comment(blank: bytes) -> int:
+    """Offset of the first comment left open in blanked text, or its length if there is none."""
+    starts = [i for i in (blank.find(b"/*"), blank.find(b"//")) if i != -1]
+    return min(starts, default=len(blank))
 
-    for sample_name in valid_samples:
-        master_content += f'#include "{sample_name}.h"\n'
 
-    master_content += """
-// Array of sample pointers for easy access
-const uint8_t* const samples[] = {
-"""
+def scan_samples(stream: BinaryIO, chunk_size: int = READ_CHUNK) -> Iterator[Event]:
+    """Lex sampleNN[] arrays out of a binary stream, yielding their bytes chunk by chunk."""
+    pending = b""  # unconsumed input: a possible partial declaration, comment or token
+    name: Optional[str] = None  # the array being read, None outside array bodies
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        pending += chunk
+        while True:
+            blank = _blank_comments(pending, eof)
+            # Never look into a comment still open at the end of what has been read
+            opened = len(blank) if eof else _open_comment(blank)
+            if name is None:
+                match = SAMPLE_ARRAY.search(blank, 0, opened)
+                if not match:
+                    pending = blank[min(opened, max(len(blank) - _DECL_TAIL, 0)):]
+                    break
+                name = match.group(1).decode("ascii")
+                pending = blank[match.end():]
+                yield "begin", name
+                continue
 
-    for i, sample_name in enumerate(valid_samples):
-        master_content += f"    {sample_name}{',' if i < len(valid_samples) - 1 else ''}\n"
+            # Lex only up to a separator, so a token split across chunks is kept whole
+            safe = len(blank) if eof else min(max(blank.rfind(sep) for sep in _SEPARATORS) + 1, opened)
+            close = blank.find(b"}", 0, safe)
+            tokens = blank[:safe if close == -1 else close].replace(b",", b" ").split()
+            if tokens:
+                yield "data", _decode(tokens, name)
+            if close == -1:
+                if eof:
+                    raise SplitError(f"{name}: array is not closed before the end of the file")
+                pending = pending[safe:]
+                break
+            pending = pending[close + 1:]
+            yield "end", name
+            name = None
 
-    master_content += """};
 
-// Array of sample lengths
-const uint16_t sample_lengths[] = {
-"""
+@dataclass
+class SampleArray:
+    """One sampleNN[] array found in a pasted header."""
+    name: str
+    data: bytes  # the sample's storage, e.g. little-endian int16
 
-    for i, sample_name in enumerate(valid_samples):
-        master_content += f"    {sample_name.upper()}_LEN{',' if i < len(valid_samples) - 1 else ''}\n"
+    def pcm(self) -> bytes:
+        return self.data
 
-    master_content += """};
 
-#define NUM_SAMPLES (sizeof(samples) / sizeof(samples[0]))
+def parse_samples(content: Union[str, bytes]) -> List[SampleArray]:
+    """Every sample array in a header's text, in file order, empty placeholders included."""
+    raw = content.encode() if isinstance(content, str) else content
+    arrays: List[SampleArray] = []
+    data = bytearray()
+    for kind, value in scan_samples(io.BytesIO(raw)):
+        if kind == "begin":
+            data = bytearray()
+        elif kind == "data":
+            data += value
+        else:
+            arrays.append(SampleArray(value, bytes(data)))
+    return arrays
 
-#endif // SAMPLES_H
-"""
-    
-    master_file = output_dir / "samples.h"
-    master_file.write_text(master_content)
-    print(f"Created master include file: {master_file}")
+
+# How each sample array is written out: one sampleNN.h per array, all
+# included through samples.h into main.cpp, or one sampleNN.cpp
+# translation unit per array behind a samples.h of extern declarations
+EMIT_FORMS = ("headers", "units")
+
+# How the bytes are spelled: c16 brace lists (0xDE, 0xFF, ...), str string
+# literals ("\xDE\xFF..."), which g++ parses many times faster, or i16 int16_t
+# values (-34, 120, ...), half as many and readable with one aligned load
+FORMATS = ("c16", "str", "i16")
+
+# Per-sample files a previous split may have left behind, see _stale_outputs
+_SAMPLE_OUTPUT = re.compile(r"sample\d+\.(h|cpp)")
+
+
+@dataclass
+class SplitResult:
+    """What extract_samples found, and which files it had to touch."""
+    samples: List[str] = field(default_factory=list)  # the non-empty arrays, in file order
+    byte_counts: List[int] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)  # empty placeholder arrays
+    outputs: List[Path] = field(default_factory=list)  # sampleNN.h or sampleNN.cpp for each of samples
+    master_file: Optional[Path] = None
+    updated: List[Path] = field(default_factory=list)  # new or changed on disk
+    unchanged: List[Path] = field(default_factory=list)  # left alone, mtime and all
+    removed: List[Path] = field(default_factory=list)  # per-sample files no longer wanted
+    bytes_in: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_in / 1e6 / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return f"{len(self.updated)} updated, {len(self.unchanged)} unchanged, {len(self.removed)} removed"
+
+
+def _stale_outputs(output_dir: Path, outputs: List[Path], placeholders: List[str]) -> List[Path]:
+    """sampleNN.h / sampleNN.cpp files in output_dir that this split did not produce.
+
+    These are arrays the input no longer has, or the other emit form's
+    files; a leftover sampleNN.cpp would otherwise define its array twice.
+    Files of slots the input still declares as empty placeholders are kept:
+    the shipped sample.h is all placeholders, and its split data is real.
+    """
+    keep = {p.name for p in outputs}
+    return sorted(p for p in output_dir.iterdir()
+                  if _SAMPLE_OUTPUT.fullmatch(p.name) and p.name not in keep and p.stem not in placeholders)
+
+
+def extract_samples(input_file: Path, output_dir: Path, chunk_size: int = READ_CHUNK,
+                    emit: str = "headers", fmt: str = "c16") -> SplitResult:
+    """Extract each sample array into its own file, plus samples.h for them.
+
+    emit is one of EMIT_FORMS: "headers" writes sampleNN.h files that
+    samples.h includes, "units" writes sampleNN.cpp files that the build
+    compiles separately, with samples.h holding only extern declarations
+    and the length table.  fmt is one of FORMATS.
+
+    Each file is streamed to a temporary file and only moved into place
+    if its bytes differ from what is already there, so a re-split of an
+    unchanged array leaves its mtime alone and the firmware build skips
+    it.  Files of arrays that have gone from the input are deleted; those of
+    arrays it still declares empty are left alone.
+
+    Raises SplitError if input_file cannot be read, holds a malformed array
+    or has no non-empty array at all, in which case nothing is written.
+    """
+    if emit not in EMIT_FORMS:
+        raise SplitError(f"Unknown emit form {emit!r}; choose from {', '.join(EMIT_FORMS)}")
+    if fmt not in FORMATS:
+        raise SplitError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}")
+    units = emit == "units"
+    dialect = hexfmt.DIALECTS[fmt]
+    start = time.perf_counter()
+    result = SplitResult()
+    out = formatter = tmp = None
+    try:
+        with input_file.open("rb") as stream:
+            for kind, value in scan_samples(stream, chunk_size):
+                if kind == "data":
+                    if out is None:
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        output = output_dir / f"{name}{'.cpp' if units else '.h'}"
+                        tmp = headers.temp_path_for(output)
+                        out = tmp.open("w")
+                        out.write(headers.sample_source_prefix(name, dialect.ctype) if units
+                                  else headers.sample_header_prefix(name, dialect.ctype))
+                        formatter = hexfmt.StreamFormatter(out, dialect)
+                    formatter.write(value)
+                elif kind == "begin":
+                    name = value
+                elif out is None:
+                    # Skip empty samples (placeholders)
+                    result.skipped.append(name)
+                else:
+                    try:
+                        formatter.close()
+                    except ValueError as e:
+                        raise SplitError(f"{name}: {e}") from e
+                    out.write(headers.sample_source_suffix() if units
+                              else headers.sample_header_suffix(name, frames=frames_in(formatter.byte_count, "pcm16")))
+                    out.close()
+                    out = None
+                    (result.updated if headers.replace_if_changed(tmp, output) else result.unchanged).append(output)
+                    result.samples.append(name)
+                    result.byte_counts.append(formatter.byte_count)
+                    result.outputs.append(output)
+            result.bytes_in = stream.tell()
+        if not result.samples:
+            raise SplitError(f"{input_file} has no sample data ({len(result.skipped)} empty placeholder arrays); "
+                             f"nothing written or removed")
+
+        # Create a master include file only for valid samples
+        result.master_file = output_dir / headers.MASTER_HEADER
+        if units:
+            # The arrays are extern here, so their lengths have to be spelled out
+            lengths = [frames_in(count, "pcm16") for count in result.byte_counts]
+            master = headers.units_master_header(result.samples, lengths, ["pcm16"] * len(lengths), dialect.ctype)
+        else:
+            master = headers.master_header(result.samples, dialect.ctype)
+        changed = headers.write_if_changed(result.master_file, master)
+        (result.updated if changed else result.unchanged).append(result.master_file)
+
+        for stale in _stale_outputs(output_dir, result.outputs, result.skipped):
+            stale.unlink()
+            result.removed.append(stale)
+    except OSError as e:
+        raise SplitError(f"Cannot split {input_file} into {output_dir}: {e.strerror or e}") from e
+    finally:
+        if out is not None:
+            out.close()
+        if tmp is not None and tmp.exists():
+            tmp.unlink()
+
+    result.seconds = time.perf_counter() - start
+    return result
 
 
 def main():
-    input_file = Path("src/sample.h")
-    output_dir = Path("src/samples")
-    
-    if not input_file.exists():
-        print(f"Error: Input file {input_file} not found")
-        return
-    
-    extract_samples(input_file, output_dir)
-    print("Sample extraction complete!")
+    parser = argparse.ArgumentParser(
+        description="Split a hand-pasted sample.h into one sampleNN.h (or sampleNN.cpp) per array plus samples.h"
+    )
+    parser.add_argument("input", nargs="?", type=Path, default=Path("src/sample.h"),
+                        help="Header holding the sampleNN[] arrays (default: src/sample.h)")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("src/samples"),
+                        help="Directory for the split headers (default: src/samples)")
+    parser.add_argument("--emit", choices=EMIT_FORMS, default="headers",
+                        help="headers = sampleNN.h included through samples.h into main.cpp (default); "
+                             "units = one sampleNN.cpp per sample, compiled in parallel, with samples.h "
+                             "declaring them extern")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="c16",
+                        help="c16 = brace lists, 16 values per line (default); str = string literals, "
+                             "which the compiler parses much faster; i16 = int16_t arrays, which the "
+                             "firmware reads with one aligned load")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"Error: Input file {args.input} not found")
+        sys.exit(1)
+
+    try:
+        result = extract_samples(args.input, args.output_dir, emit=args.emit, fmt=args.format)
+    except SplitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Found {len(result.samples) + len(result.skipped)} sample arrays")
+    for sample_name in result.skipped:
+        print(f"Skipping empty sample: {sample_name}")
+    updated = set(result.updated)
+    for output_file, count in zip(result.outputs, result.byte_counts):
+        print(f"{'Updated' if output_file in updated else 'Unchanged'}: {output_file} ({count} bytes)")
+    for output_file in result.removed:
+        print(f"Removed: {output_file}")
+    print(f"{'Updated' if result.master_file in updated else 'Unchanged'} master include file: {result.master_file}")
+    print(f"Files: {result.summary()}")
+    print(f"Sample extraction complete! {result.bytes_in / 1e6:.2f} MB in {result.seconds:.2f} s "
+          f"({result.mb_per_s:.1f} MB/s)")
 
 
 if __name__ == "__main__":
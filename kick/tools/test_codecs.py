@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# test_codecs.py — bit‑exact checks of the storage encoders and reference decoders
+# MIT‑like license, standard library only
+#
+# Run from kick/tools with: python -m unittest test_codecs
+# The golden vectors pin what readPCM10, readPCM8 and readADPCM in
+# kick/src/main.cpp return, so a change to the packing, the rounding or the
+# ADPCM step and index tables fails here before it reaches the firmware.
+
+import math
+import sys
+import unittest
+from array import array
+from typing import List, Tuple
+
+import adpcm
+import pcmformat
+
+
+def encode(fmt: str, samples: List[int]) -> Tuple[bytes, int]:
+    """Encode samples without dither; returns the storage bytes and the encoder's frame count."""
+    pcm = array("h", samples)
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    encoder = pcmformat.PcmEncoder(fmt, dither=False)
+    data = encoder.encode(pcm.tobytes()) + encoder.flush()
+    return data, encoder.frames
+
+
+def sine(n: int) -> List[int]:
+    return [int(12000 * math.sin(i / 3)) for i in range(n)]
+
+
+class GoldenVectors(unittest.TestCase):
+    def test_pcm8(self):
+        data, frames = encode("pcm8", [0, 127, 128, -129, 32767, -32768, 1000, -1000])
+        self.assertEqual(data.hex(), "000001ff7f8004fc")
+        self.assertEqual(list(pcmformat.decode(data, "pcm8", frames)),
+                         [0, 0, 256, -256, 32512, -32768, 1024, -1024])
+
+    def test_pcm10(self):
+        data, frames = encode("pcm10", [0, 31, 32, -33, 32767, -32768, 12345])
+        self.assertEqual(data.hex(), "000010c0ffff01180c00")
+        self.assertEqual(frames, 7)
+        self.assertEqual(list(pcmformat.decode(data, "pcm10", frames)), [0, 0, 64, -64, 32704, -32768, 12352])
+
+    def test_adpcm(self):
+        data, frames = encode("adpcm", sine(12))
+        self.assertEqual(len(data), adpcm.BLOCK_BYTES)
+        self.assertEqual(data[:10].hex(), "0000000070777777c7cb")
+        self.assertEqual(list(pcmformat.decode(data, "adpcm", frames)),
+                         [0, 11, 41, 104, 240, 533, 1164, 2521, 5431, 1689, -1833, -5950])
+
+    def test_adpcm_block_header(self):
+        # The second block starts from the decoder state after sample 255
+        data, frames = encode("adpcm", sine(300))
+        self.assertEqual(data[adpcm.BLOCK_BYTES:adpcm.BLOCK_BYTES + 4].hex(), "a1f94100")
+        self.assertEqual(list(pcmformat.decode(data, "adpcm", frames)[254:260]),
+                         [1891, -1631, -5748, -8515, -11031, -12403])
+
+    def test_adpcm_tables(self):
+        self.assertEqual(adpcm.INDEX_TABLE, (-1, -1, -1, -1, 2, 4, 6, 8))
+        self.assertEqual(len(adpcm.STEP_TABLE), 89)
+        self.assertEqual((adpcm.STEP_TABLE[0], adpcm.STEP_TABLE[44], adpcm.STEP_TABLE[88]), (7, 494, 32767))
+
+
+class Seeking(unittest.TestCase):
+    def setUp(self):
+        self.data, self.frames = encode("adpcm", sine(3 * adpcm.BLOCK_SAMPLES + 100))
+        self.straight = adpcm.decode(self.data, self.frames)
+
+    def check(self, start: int, count: int):
+        self.assertEqual(adpcm.decode_from(self.data, start, count), self.straight[start:start + count])
+
+    def test_block_boundary(self):
+        self.check(adpcm.BLOCK_SAMPLES, 50)
+        self.check(2 * adpcm.BLOCK_SAMPLES, adpcm.BLOCK_SAMPLES)
+
+    def test_mid_block(self):
+        self.check(adpcm.BLOCK_SAMPLES + 77, 20)
+
+    def test_across_blocks(self):
+        self.check(adpcm.BLOCK_SAMPLES - 3, adpcm.BLOCK_SAMPLES + 6)
+
+
+class Padding(unittest.TestCase):
+    def test_frames_drop_padding(self):
+        for fmt, n in (("pcm10", 7), ("adpcm", adpcm.BLOCK_SAMPLES + 1)):
+            with self.subTest(fmt=fmt):
+                data, frames = encode(fmt, sine(n))
+                self.assertEqual(frames, n)
+                self.assertGreater(pcmformat.frames_in(len(data), fmt), n)
+                self.assertEqual(len(pcmformat.decode(data, fmt)), pcmformat.frames_in(len(data), fmt))
+                self.assertEqual(len(pcmformat.decode(data, fmt, frames)), n)
+
+    def test_round_trip_lengths(self):
+        for fmt in pcmformat.FORMAT_IDS:
+            for n in (0, 1, 4, 255, 256, 257):
+                with self.subTest(fmt=fmt, n=n):
+                    data, frames = encode(fmt, sine(n))
+                    self.assertEqual(len(data), pcmformat.bytes_per_frames(n, fmt))
+                    self.assertEqual(len(pcmformat.decode(data, fmt, frames)), n)
+
+
+if __name__ == "__main__":
+    unittest.main()
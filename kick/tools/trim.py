@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# trim.py — find and cut leading/trailing silence, with a short fade at each cut
+# MIT‑like license, standard library only (NumPy is used when installed)
+
+import math
+import sys
+from array import array
+from dataclasses import dataclass
+from operator import mul
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional fast path
+    np = None
+
+WINDOW_MS = 5.0          # RMS analysis window
+THRESHOLD_DBFS = -60.0   # the 10‑bit PWM's LSB is ≈ -60 dBFS: quieter is inaudible on the module
+FLOOR_MARGIN_DB = 6.0    # keep anything this far above the measured noise floor
+FLOOR_PERCENTILE = 0.1   # noise floor = this quantile of window RMS levels
+PREROLL_MS = 1.0         # kept before the first audible sample
+FADE_MS = 5.0            # fade applied at a trailing cut (and a 1/10 of it at a leading cut)
+
+
+@dataclass
+class TrimPoints:
+    """Where a sample is cut, in frames of the source, and why."""
+    total: int
+    start: int
+    end: int
+    noise_floor_dbfs: float
+    threshold_dbfs: float
+
+    @property
+    def kept(self) -> int:
+        return self.end - self.start
+
+    @property
+    def removed(self) -> int:
+        return self.total - self.kept
+
+
+def _dbfs(level: float) -> float:
+    return 20 * math.log10(level / 32768) if level > 0 else -math.inf
+
+
+def _samples(chunk: bytes) -> array:
+    samples = array("h")
+    samples.frombytes(chunk)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def _window_rms(samples: array, window: int) -> List[float]:
+    """RMS of each whole window of samples (vectorised when NumPy is available)."""
+    whole = len(samples) - len(samples) % window
+    if np is not None:
+        blocks = np.frombuffer(samples, dtype=np.int16, count=whole).astype(np.float64).reshape(-1, window)
+        return np.sqrt((blocks * blocks).mean(axis=1)).tolist()
+    rms = []
+    for b in range(0, whole, window):
+        block = samples[b:b + window]
+        rms.append(math.sqrt(sum(map(mul, block, block)) / window))
+    return rms
+
+
+def analyze(chunks: Iterable[bytes], rate: float, threshold_dbfs: float = THRESHOLD_DBFS) -> TrimPoints:
+    """Scan int16 PCM chunks once and return where to cut.
+
+    Window RMS levels give the noise floor and the last audible window;
+    the first audible sample is found exactly so attacks are never clipped.
+    Memory is one float per window plus one chunk.
+    """
+    window = max(1, int(rate * WINDOW_MS / 1000))
+    levels: List[float] = []
+    pending = array("h")
+    total = 0
+    first_loud_sample: Optional[int] = None
+    peak_gate = 10 ** (threshold_dbfs / 20) * 32768  # provisional, refined below
+    for chunk in chunks:
+        samples = _samples(chunk)
+        if first_loud_sample is None:
+            for i, x in enumerate(samples):
+                if x > peak_gate or -x > peak_gate:
+                    first_loud_sample = total + i
+                    break
+        total += len(samples)
+        pending.extend(samples)
+        whole = len(pending) - len(pending) % window
+        levels.extend(_window_rms(pending[:whole], window))
+        del pending[:whole]
+    if pending:
+        levels.append(math.sqrt(sum(x * x for x in pending) / len(pending)))
+
+    if not levels:
+        return TrimPoints(0, 0, 0, -math.inf, threshold_dbfs)
+
+    ordered = sorted(levels)
+    floor = ordered[int(FLOOR_PERCENTILE * (len(ordered) - 1))]
+    threshold = max(10 ** (threshold_dbfs / 20) * 32768, floor * 10 ** (FLOOR_MARGIN_DB / 20))
+
+    last_loud = max((i for i, level in enumerate(levels) if level > threshold), default=None)
+    if last_loud is None or first_loud_sample is None:
+        # Nothing audible: keep a single window rather than an empty array
+        return TrimPoints(total, 0, min(total, window), _dbfs(floor), _dbfs(threshold))
+
+    # A noisy lead‑in can trip the absolute gate; never start before the
+    # first window that clears the noise‑floor threshold
+    first_loud = next(i for i, level in enumerate(levels) if level > threshold)
+    onset = max(first_loud_sample, first_loud * window)
+    start = max(0, onset - int(rate * PREROLL_MS / 1000))
+    end = min(total, (last_loud + 1) * window + int(rate * FADE_MS / 1000))
+    return TrimPoints(total, start, max(end, start + 1), _dbfs(floor), _dbfs(threshold))
+
+
+def fade_chunks(chunks: Iterable[bytes], points: TrimPoints, rate: float) -> Iterator[bytes]:
+    """Apply a short fade‑in at a leading cut and a fade‑out at a trailing cut.
+
+    chunks must already be limited to points.start .. points.end.
+    """
+    fade_in = int(rate * FADE_MS / 10000) if points.start > 0 else 0
+    fade_out = int(rate * FADE_MS / 1000) if points.end < points.total else 0
+    fade_out = min(fade_out, points.kept)
+    pos = 0
+    for chunk in chunks:
+        samples = _samples(chunk)
+        n = len(samples)
+        if pos < fade_in:
+            for i in range(0, min(n, fade_in - pos)):
+                samples[i] = int(samples[i] * (pos + i) / fade_in)
+        tail_start = points.kept - fade_out
+        if pos + n > tail_start:
+            for i in range(max(0, tail_start - pos), n):
+                remaining = points.kept - (pos + i)
+                samples[i] = int(samples[i] * remaining / (fade_out + 1))
+        pos += n
+        if sys.byteorder == "big":
+            samples.byteswap()
+        yield samples.tobytes()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# watch.py — poll files for changes and rebuild once they settle
+# MIT‑like license, standard library only
+#
+# Polling keeps this portable and dependency‑free: a snapshot is one
+# stat() per watched file, a few hundred microseconds for a bank of
+# samples.  Editors and sample tools often write a file in several steps
+# (truncate, write, rename), so a change only triggers a rebuild once
+# nothing has moved for the debounce period.
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+POLL_SECONDS = 0.05
+DEBOUNCE_SECONDS = 0.2
+
+# path → (size, mtime_ns), None if missing
+Snapshot = Dict[Path, Optional[Tuple[int, int]]]
+
+
+def stat_files(paths: Iterable[Path]) -> Snapshot:
+    """Snapshot of the given files; missing ones map to None."""
+    snapshot: Snapshot = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            snapshot[path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            snapshot[path] = None
+    return snapshot
+
+
+def changed(before: Snapshot, after: Snapshot) -> Set[Path]:
+    """Paths added, removed or modified between two snapshots."""
+    return {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+
+
+def watch(snapshot: Callable[[], Snapshot], rebuild: Callable[[Set[Path]], None],
+          poll: float = POLL_SECONDS, debounce: float = DEBOUNCE_SECONDS) -> None:
+    """Call rebuild(changed paths) whenever snapshot() changes and then holds still for debounce seconds.
+
+    The snapshot is retaken after each rebuild, so files the rebuild
+    itself writes are not reported back.  Runs until interrupted.
+    """
+    current = snapshot()
+    while True:
+        time.sleep(poll)
+        latest = snapshot()
+        pending = changed(current, latest)
+        if not pending:
+            continue
+        # Debounce: keep collecting until a full period passes without news
+        settle = time.monotonic() + debounce
+        while time.monotonic() < settle:
+            time.sleep(poll)
+            newer = snapshot()
+            more = changed(latest, newer)
+            if more:
+                pending |= more
+                settle = time.monotonic() + debounce
+            latest = newer
+        rebuild(pending)
+        current = snapshot()
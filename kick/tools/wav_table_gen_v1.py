@@ -8,6 +8,9 @@ from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+import hexfmt
+import wavin
+
 
 MAX_FILES = 18
 MAX_SECONDS = 20
@@ -18,7 +21,7 @@ def pick_files() -> list[Path]:
     root = tk.Tk()
     root.withdraw()
     paths = filedialog.askopenfilenames(
-        title=f"Select up to {MAX_FILES} mono 16‑bit PCM WAV files",
+        title=f"Select up to {MAX_FILES} WAV files",
         filetypes=[("Wave files", "*.wav"), ("All files", "*.*")]
     )
     root.destroy()
@@ -37,25 +40,23 @@ def process_file(in_path: Path) -> None:
 
     out_path = in_path.with_suffix(".txt")
 
-    with wave.open(str(in_path), "rb") as w:
-        if w.getnchannels() != 1:
-            bail("Stereo is not supported. Use mono.")
-        if w.getsampwidth() != 2:
-            bail("Only 16‑bit PCM is supported.")
-        if w.getcomptype() != "NONE":
-            bail("Compressed WAV is not supported.")
-
-        rate = w.getframerate()
-        frames = min(rate * MAX_SECONDS, w.getnframes())  # up to 20 seconds
-        raw_bytes = w.readframes(frames)
-
-    # Build comma‑separated 0x?? string
-    hex_line = ",".join(f"0x{b:02X}" for b in raw_bytes)
+    try:
+        with wavin.open_wav(in_path) as w:
+            rate = w.getframerate()
+            frames = min(rate * MAX_SECONDS, w.getnframes())  # up to 20 seconds
+            raw_bytes = w.readview(frames)  # a view of the mapped file for mono 16‑bit
+
+            # Build comma‑separated 0x?? string
+            hex_line = hexfmt.format_bytes(raw_bytes, hexfmt.HEX)
+            byte_count = len(raw_bytes)
+            raw_bytes.release()
+    except wave.Error as e:
+        bail(f"Cannot read {in_path.name}: {e}")
     out_path.write_text(hex_line)
 
     messagebox.showinfo(
         "Done",
-        f"Wrote {len(raw_bytes)} bytes ({len(hex_line)} characters) to {out_path.name}"
+        f"Wrote {byte_count} bytes ({len(hex_line)} characters) to {out_path.name}"
     )
 
 
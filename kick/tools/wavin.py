@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# wavin.py — read any common WAV as mono 16‑bit PCM: downmix, 8/16/24/32‑bit int, 32/64‑bit float
+# MIT‑like license, standard library only (NumPy is used when installed)
+#
+# The wave module only reads integer PCM with a plain fmt chunk.  WavReader
+# parses the RIFF chunks itself, so WAVE_FORMAT_EXTENSIBLE and IEEE float
+# files load too, and converts every read to what the converters expect:
+# mono, little‑endian int16.  Mono 16‑bit input passes through untouched;
+# anything that needs rounding (downmix, >16 bits, float) gets TPDF dither
+# of ±1 LSB unless it is turned off.  The NumPy and array paths produce
+# identical samples.  Files are memory‑mapped, and mono 16‑bit PCM is
+# handed out as views of the mapping without being copied.
+
+import mmap
+import random
+import struct
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+from errors import ToolError
+from hexfmt import BytesLike
+from pcmformat import DITHER_SEED
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional fast path
+    np = None
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_INT_WIDTHS = (1, 2, 3, 4)
+_FLOAT_WIDTHS = (4, 8)
+
+
+class WavError(wave.Error, ToolError):
+    """Raised for WAV files that are malformed or in an unsupported encoding."""
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    """The source encoding, as declared by the fmt chunk."""
+    channels: int
+    rate: int
+    sampwidth: int  # bytes per sample per channel
+    is_float: bool
+    frames: int
+    data_offset: int
+
+    @property
+    def passthrough(self) -> bool:
+        """True when the data already is mono int16 and is returned as is."""
+        return self.channels == 1 and self.sampwidth == 2 and not self.is_float
+
+    def describe(self) -> str:
+        kind = "float" if self.is_float else "int"
+        layout = "mono" if self.channels == 1 else f"{self.channels} ch"
+        return f"{self.sampwidth * 8}-bit {kind}, {layout}, {self.rate} Hz"
+
+
+def parse_header(data: BytesLike) -> WavInfo:
+    """Walk the RIFF chunks in data up to the data chunk and return the stream's layout."""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise WavError("not a RIFF/WAVE file")
+    fmt = None
+    pos = 12
+    while True:
+        if pos + 8 > len(data):
+            raise WavError("no data chunk" if fmt else "no fmt chunk")
+        chunk_id, size = bytes(data[pos:pos + 4]), struct.unpack_from("<I", data, pos + 4)[0]
+        pos += 8
+        if chunk_id == b"fmt ":
+            fmt = bytes(data[pos:pos + size])
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavError("data chunk before fmt chunk")
+            break
+        pos += size + (size & 1)  # chunks are padded to even sizes
+
+    if len(fmt) < 16:
+        raise WavError("fmt chunk is truncated")
+    tag, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if tag == WAVE_FORMAT_EXTENSIBLE:
+        if len(fmt) < 40:
+            raise WavError("WAVE_FORMAT_EXTENSIBLE fmt chunk is truncated")
+        tag = struct.unpack("<H", fmt[24:26])[0]  # first field of the SubFormat GUID
+    if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        raise WavError(f"compressed WAV (format 0x{tag:04X}) is not supported")
+    is_float = tag == WAVE_FORMAT_IEEE_FLOAT
+    if channels < 1 or rate < 1:
+        raise WavError("fmt chunk declares no channels or no sample rate")
+    sampwidth = block_align // channels
+    if sampwidth not in (_FLOAT_WIDTHS if is_float else _INT_WIDTHS) or sampwidth * channels != block_align:
+        raise WavError(f"unsupported sample layout: {bits}-bit {'float' if is_float else 'PCM'}, "
+                       f"{block_align} bytes per frame")
+
+    # Streamed writers leave size 0 or 0xFFFFFFFF; trust the file instead
+    available = len(data) - pos
+    size = size if 0 < size <= available else available
+    return WavInfo(channels, rate, sampwidth, is_float, size // block_align, pos)
+
+
+class _Dither:
+    """Seeded TPDF dither, shared by both backends so they round identically."""
+
+    def __init__(self, seed: int = DITHER_SEED):
+        self._rng = random.Random(seed)
+
+    def take(self, n: int) -> List[float]:
+        rnd = self._rng.random
+        return [rnd() - rnd() for _ in range(n)]
+
+
+def _decode_array(raw: bytes, info: WavInfo) -> Union[array, memoryview]:
+    """Samples of raw in the source's own scale (ints, or floats in ±1.0)."""
+    width = info.sampwidth
+    if info.is_float:
+        samples = array("f" if width == 4 else "d", raw)
+    elif width == 1:
+        # Unsigned 8‑bit: flip the sign bit and use it as the high byte of an int16
+        wide = bytearray(2 * len(raw))
+        wide[1::2] = raw.translate(bytes((b ^ 0x80) for b in range(256)))
+        samples = array("h", wide)
+    elif width == 3:
+        # Widen to int32 with the 24 bits on top; the scale is fixed up by _scale
+        wide = bytearray(4 * (len(raw) // 3))
+        wide[1::4], wide[2::4], wide[3::4] = raw[0::3], raw[1::3], raw[2::3]
+        samples = array("i", wide)
+    else:
+        samples = array("h" if width == 2 else "i", raw)
+    if sys.byteorder == "big":
+        samples.byteswap()  # pragma: no cover
+    return samples
+
+
+def _scale(info: WavInfo) -> float:
+    """Factor taking decoded source samples onto the int16 scale."""
+    if info.is_float:
+        return 32768.0
+    return {1: 1.0, 2: 1.0, 3: 1 / 65536, 4: 1 / 65536}[info.sampwidth]
+
+
+def _convert_python(raw: BytesLike, info: WavInfo, dither: Optional[_Dither]) -> array:
+    samples = _decode_array(bytes(raw), info)
+    scale, n = _scale(info), info.channels
+    if n == 1:
+        values: Sequence[float] = samples if scale == 1.0 else [x * scale for x in samples]
+    else:
+        values = [sum(frame) * scale / n for frame in zip(*(samples[c::n] for c in range(n)))]
+    if scale == 1.0 and n == 1:
+        return array("h", values)  # exact: 8/16‑bit mono
+    out = array("h", bytes(2 * len(values)))
+    noise = dither.take(len(values)) if dither else None
+    for i, x in enumerate(values):
+        x = -32768.0 if x < -32768.0 else 32767.0 if x > 32767.0 else x
+        q = int((x + noise[i] if noise else x) + 32768.5) - 32768
+        out[i] = -32768 if q < -32768 else 32767 if q > 32767 else q
+    return out
+
+
+def _convert_numpy(raw: BytesLike, info: WavInfo, dither: Optional[_Dither]) -> array:
+    width, n = info.sampwidth, info.channels
+    if info.is_float:
+        samples = np.frombuffer(raw, dtype="<f4" if width == 4 else "<f8").astype(np.float64)
+    elif width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int32) - 128) << 8
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (b[:, 0] << 8) | (b[:, 1] << 16) | (b[:, 2] << 24)
+    else:
+        samples = np.frombuffer(raw, dtype="<i2" if width == 2 else "<i4")
+    scale = _scale(info)
+    if n == 1 and scale == 1.0:
+        return array("h", samples.astype("<i2").tobytes())  # exact: 8/16‑bit mono
+    values = samples.reshape(-1, n).astype(np.float64)
+    # Same operation order as the Python path: channel sum, scale, then mean
+    values = (values.sum(axis=1) if n > 1 else values[:, 0]) * scale
+    if n > 1:
+        values /= n
+    values = np.clip(values, -32768.0, 32767.0)
+    if dither:
+        values = values + np.array(dither.take(len(values)))
+    q = np.floor(values + 32768.5) - 32768
+    return array("h", np.clip(q, -32768, 32767).astype("<i2").tobytes())
+
+
+def to_int16_mono(raw: BytesLike, info: WavInfo, dither: Optional[_Dither] = None) -> bytes:
+    """Convert whole frames of source data to little‑endian mono int16 PCM."""
+    if info.passthrough:
+        return raw
+    convert = _convert_numpy if np is not None else _convert_python
+    out = convert(raw, info, dither)
+    if sys.byteorder == "big":
+        out.byteswap()  # pragma: no cover
+    return out.tobytes()
+
+
+class WavReader:
+    """A wave.Wave_read look‑alike over a memory‑mapped file, always yielding mono int16.
+
+    getsampwidth() and getnchannels() describe the converted output (2 and
+    1); the source's own encoding is in .info.  readview() hands out
+    memoryviews straight into the mapping when the file is already mono
+    16‑bit, so the PCM is never copied; the OS page cache backs repeated
+    reads of the same files.  Given data, it reads from that buffer instead.
+    """
+
+    def __init__(self, path: Union[str, Path], dither: bool = True, data: Optional[BytesLike] = None):
+        self._map: Optional[mmap.mmap] = None
+        if data is None:
+            with open(path, "rb") as f:
+                try:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # zero-length file
+                    raise WavError("file is empty") from None
+            data = self._map
+        try:
+            self.info = parse_header(data)
+        except Exception:
+            self.close()
+            raise
+        self._frame_bytes = self.info.channels * self.info.sampwidth
+        begin = self.info.data_offset
+        self._data = memoryview(data)[begin:begin + self.info.frames * self._frame_bytes]
+        self._dither = _Dither() if dither and not self.info.passthrough else None
+        self._pos = 0
+
+    def __enter__(self) -> "WavReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if hasattr(self, "_data"):
+            self._data.release()
+        if self._map is None:
+            return
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # views handed out are still alive; the mapping goes with the last of them
+
+    def getnchannels(self) -> int:
+        return 1
+
+    def getsampwidth(self) -> int:
+        return 2
+
+    def getframerate(self) -> int:
+        return self.info.rate
+
+    def getnframes(self) -> int:
+        return self.info.frames
+
+    def tell(self) -> int:
+        return self._pos
+
+    def setpos(self, pos: int) -> None:
+        if not 0 <= pos <= self.info.frames:
+            raise WavError("position not in range")
+        self._pos = pos
+
+    def readview(self, n: int) -> memoryview:
+        """Up to n frames as int16 bytes; zero‑copy for mono 16‑bit files."""
+        n = max(0, min(n, self.info.frames - self._pos))
+        raw = self._data[self._pos * self._frame_bytes:(self._pos + n) * self._frame_bytes]
+        self._pos += n
+        if self.info.passthrough:
+            return raw
+        return memoryview(to_int16_mono(raw, self.info, self._dither))
+
+    def readframes(self, n: int) -> bytes:
+        """Up to n frames as a bytes copy, as wave.Wave_read.readframes."""
+        return bytes(self.readview(n))
+
+    def samples(self, n: int) -> Union[memoryview, array]:
+        """Up to n frames as int16 values: a view on the mapping where possible."""
+        view = self.readview(n)
+        if sys.byteorder == "little":
+            return view.cast("h")
+        samples = array("h")  # pragma: no cover
+        samples.frombytes(view)  # pragma: no cover
+        samples.byteswap()  # pragma: no cover
+        return samples  # pragma: no cover
+
+
+def open_wav(path: Union[str, Path], dither: bool = True, data: Optional[BytesLike] = None) -> WavReader:
+    """Open path for reading as mono int16; see WavReader.
+
+    With data, the file's contents already read into memory are parsed
+    instead and path is only used in messages.
+    """
+    return WavReader(path, dither, data)
+
+
+@dataclass(frozen=True)
+class Pcm:
+    """A whole file read into memory as mono int16."""
+    data: bytes  # little‑endian int16
+    rate: int
+    info: WavInfo  # the source encoding
+
+    @property
+    def frames(self) -> int:
+        return len(self.data) // 2
+
+    def samples(self) -> array:
+        """The PCM as native int16 values."""
+        samples = array("h", self.data)
+        if sys.byteorder == "big":
+            samples.byteswap()  # pragma: no cover
+        return samples
+
+
+def read_pcm(path: Union[str, Path], dither: bool = True, data: Optional[BytesLike] = None,
+             max_frames: Optional[int] = None) -> Pcm:
+    """Read up to max_frames frames (default: all) of path as mono int16; see WavReader."""
+    with open_wav(path, dither, data) as w:
+        frames = w.getnframes() if max_frames is None else min(max_frames, w.getnframes())
+        return Pcm(w.readframes(frames), w.getframerate(), w.info)
@@ -45,6 +45,7 @@ volatile uint32_t tblAcc      = 0;
 volatile uint32_t tblStepFP   = 1UL << FRAC_BITS;
 volatile const uint8_t* curSample = sample01;
 volatile uint32_t curLen16   = sampleLens[0];
+volatile bool     curAligned  = false;  // curSample starts on a halfword boundary
 
 uint sliceAudio, sliceIRQ;
 
@@ -56,6 +57,13 @@ inline int16_t readPCM(const volatile uint8_t* base, uint32_t idx) {
   return int16_t(base[byteIndex] | (base[byteIndex + 1] << 8));
 }
 
+// One aligned halfword load from XIP flash instead of two byte loads.
+// The Cortex-M0+ faults on unaligned halfword loads, so this is only used
+// for samples that start on an even address (see curAligned).
+inline int16_t readPCMAligned(const volatile uint8_t* base, uint32_t idx) {
+  return ((const volatile int16_t*)base)[idx];
+}
+
 void on_pwm_wrap() {
   pwm_clear_irq(sliceIRQ);
 
@@ -74,8 +82,14 @@ void on_pwm_wrap() {
     return;
   }
 
-  int16_t s1 = readPCM(curSample, idx);
-  int16_t s2 = (idx + 1 < curLen16) ? readPCM(curSample, idx + 1) : 0;
+  int16_t s1, s2;
+  if (curAligned) {
+    s1 = readPCMAligned(curSample, idx);
+    s2 = (idx + 1 < curLen16) ? readPCMAligned(curSample, idx + 1) : 0;
+  } else {
+    s1 = readPCM(curSample, idx);
+    s2 = (idx + 1 < curLen16) ? readPCM(curSample, idx + 1) : 0;
+  }
   int32_t mix = ((int32_t)s1 * ( (1UL<<FRAC_BITS) - frac ) + (int32_t)s2 * frac) >> FRAC_BITS;
   int16_t interpolated = int16_t(mix);
 
@@ -123,6 +137,7 @@ void onTrigger() {
   uint8_t idx = selectSampleIndex();
   curSample = samples[idx];
   curLen16  = sampleLens[idx];
+  curAligned = ((uintptr_t)samples[idx] & 1) == 0;
 
   uint16_t raw = analogRead(A0);
   float rate   = 0.5f + (raw / 1023.0f);